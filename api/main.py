@@ -2,15 +2,24 @@
 Main entry point for Vāhan-Rakshak FastAPI backend
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
-# Setup logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Setup logging: records are handed to a queue and written to stderr by a
+# background listener thread, so request handlers never block on I/O
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # full format is applied by the listener
+logging.basicConfig(level=logging.DEBUG, handlers=[_queue_handler])
 # Enable debug for specific modules
 for logger_name in ["src.watsonx_agent_caller", "src.api.server", "src.orchestrator_hybrid"]:
     logging.getLogger(logger_name).setLevel(logging.DEBUG)
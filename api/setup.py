@@ -25,8 +25,10 @@ setup(
         "pydantic>=2.10.3,<3",
         "python-dotenv>=1.0.0",
     "requests>=2.32.0,<3",
+    "cachetools>=5.3.0",
+    "orjson>=3.9.0",
     "fastapi>=0.115.0,<1.0",
-        "uvicorn>=0.24.0",
+        "uvicorn[standard]>=0.24.0",
         "paho-mqtt>=1.6.1",
         "Flask>=3.0.0",
     "redis>=6.0.0",
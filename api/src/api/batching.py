@@ -0,0 +1,173 @@
+"""
+Opportunistic batching of Guardian agent calls.
+
+Concurrent requests that arrive within a short window are merged into one
+watsonx Orchestrate invocation via WatsonxAgentCaller.call_guardian_agent_batch,
+so N in-flight readings cost one agent round-trip instead of N.
+
+Readings are handed to a single background worker through an asyncio.Queue;
+the worker is the only place that decides when and how Orchestrate is called.
+The queue and worker belong to the event loop start() runs on, so the app's
+lifespan starts the batcher and closes it on shutdown.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import anyio.to_thread
+
+from src.watsonx_agent_caller import AGENT_MAX_WAIT_S, WatsonxAgentCaller
+
+logger = logging.getLogger(__name__)
+
+
+# (reading, future, time.monotonic() deadline) as queued by submit
+_Item = Tuple[Dict[str, Any], asyncio.Future, float]
+
+
+class GuardianBatcher:
+    """Coalesces concurrent Guardian calls into batched agent invocations"""
+
+    def __init__(
+        self,
+        caller: WatsonxAgentCaller,
+        agent_id: str,
+        max_batch_size: int = 16,
+        max_delay_s: float = 0.05,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        self.caller = caller
+        self.agent_id = agent_id
+        self.max_batch_size = max_batch_size
+        self.max_delay_s = max_delay_s
+        # Shared cap on concurrent Orchestrate calls; batches wait for a slot
+        self._semaphore = semaphore
+        self._queue: Optional["asyncio.Queue[_Item]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Every submitted future that has not resolved yet, wherever it is
+        self._pending: Set[asyncio.Future] = set()
+
+    def start(self) -> None:
+        """Start the background worker on the running loop (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            # A queue from an earlier loop cannot be awaited on this one
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker = loop.create_task(self._work())
+
+    async def aclose(self) -> None:
+        """Stop the worker and batches in flight, failing every reading still waiting"""
+        tasks = [t for t in (self._worker, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("Guardian batcher closed"))
+        self._pending.clear()
+
+    async def submit(
+        self,
+        vehicle_id: str,
+        action: str,
+        sensor_data: Dict[str, Any],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue one reading and wait for its assessment
+
+        Args:
+            vehicle_id: Vehicle identifier
+            action: Guardian action (monitor_driver, monitor_speed, ...)
+            sensor_data: Sensor readings from vehicle
+            deadline: Optional time.monotonic() deadline for the assessment;
+                defaults to AGENT_MAX_WAIT_S from now
+
+        Returns:
+            The same response shape as WatsonxAgentCaller.call_guardian_agent
+
+        Raises:
+            asyncio.TimeoutError: No assessment arrived before the deadline
+        """
+        self.start()
+        if deadline is None:
+            deadline = time.monotonic() + AGENT_MAX_WAIT_S
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        reading = {"vehicle_id": vehicle_id, "action": action, "sensor_data": sensor_data}
+        self._queue.put_nowait((reading, future, deadline))
+        return await asyncio.wait_for(future, max(0.0, deadline - time.monotonic()))
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_delay_s
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without waiting so the next batch can start collecting
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Item]) -> None:
+        # Submitters that already timed out need no assessment
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            return
+        readings = [reading for reading, _, _ in batch]
+        deadline = min(d for _, _, d in batch)
+        try:
+            if self._semaphore is not None:
+                async with self._semaphore:
+                    results = await self._invoke(readings, deadline)
+            else:
+                results = await self._invoke(readings, deadline)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        if len(results) != len(batch):
+            logger.error("Guardian batch returned %d results for %d readings", len(results), len(batch))
+            # Never leave a submitter waiting on a reading that got no result
+            for _, future, _ in batch[len(results):]:
+                if not future.done():
+                    future.set_exception(RuntimeError("Guardian batch returned no result for this reading"))
+
+    async def _invoke(self, readings: List[Dict[str, Any]], deadline: float) -> List[Dict[str, Any]]:
+        if len(readings) == 1:
+            r = readings[0]
+            return [await anyio.to_thread.run_sync(functools.partial(
+                self.caller.call_guardian_agent,
+                self.agent_id, r["vehicle_id"], r["action"], r["sensor_data"], deadline,
+            ))]
+        logger.debug("Flushing Guardian batch of %d readings", len(readings))
+        return await anyio.to_thread.run_sync(functools.partial(
+            self.caller.call_guardian_agent_batch, self.agent_id, readings, deadline,
+        ))
@@ -10,15 +10,24 @@ Behavior:
 """
 
 import os
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+import anyio.to_thread
+from fastapi import FastAPI, HTTPException, Response, Depends, Path as PathParam
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Any, Optional, List, Callable, Tuple, Annotated, AsyncIterator, Set
+from cachetools import LRUCache, TTLCache
+import time
 import logging
 import json
+import orjson
 from pathlib import Path
 
-from src.watsonx_agent_caller import WatsonxAgentCaller
+from src.watsonx_agent_caller import WATSONX_MAX_CONCURRENCY, WatsonxAgentCaller, build_session
+from src.api.batching import GuardianBatcher
 from src.tools.cargo_scanner import CargoScanner
 from src.tools.regulator_api import RegulatorAPI
 from src.tools.safety_actuator import SafetyActuator
@@ -27,7 +36,47 @@ from src.tools.speed_detector import SpeedDetector
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Vahan-Rakshak API", version="1.0.0")
+# Worker threads available for blocking watsonx calls (anyio's default is 40)
+BLOCKING_THREAD_LIMIT: int = int(os.getenv("BLOCKING_THREAD_LIMIT", "64"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _wx_sem, _guardian_batcher
+    logger.info("Event loop: %s", type(asyncio.get_running_loop()).__module__)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = BLOCKING_THREAD_LIMIT
+    try:
+        _load_swagger_bytes()
+    except HTTPException as e:
+        logger.warning(f"swagger.json not preloaded: {e.detail}")
+    # asyncio primitives belong to the loop serving the app, so make them here
+    _wx_sem = asyncio.Semaphore(WATSONX_MAX_CONCURRENCY)
+    if _wx_caller is not None:
+        _guardian_batcher = GuardianBatcher(
+            _wx_caller,
+            GUARDIAN_AGENT_ID,
+            max_batch_size=GUARDIAN_BATCH_MAX_SIZE,
+            max_delay_s=GUARDIAN_BATCH_MAX_DELAY_S,
+            semaphore=_wx_sem,
+        )
+        _guardian_batcher.start()
+    yield
+    if _guardian_batcher is not None:
+        await _guardian_batcher.aclose()
+        _guardian_batcher = None
+    if _wx_caller is not None:
+        _wx_caller.close()
+    _http_session.close()
+
+
+app = FastAPI(
+    title="Vahan-Rakshak API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# History/log responses are lists of dicts that compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # watsonx delegation config
 WATSONX_ENABLED: bool = True  # Always delegate to watsonx as per requirement
@@ -35,10 +84,17 @@ GUARDIAN_AGENT_ID: str = os.getenv("GUARDIAN_AGENT_ID", "guardian_v1")
 WATSONX_GUARDIAN_ACTION_MONITOR: str = os.getenv("WATSONX_GUARDIAN_ACTION_MONITOR", "monitor_driver")
 WATSONX_GUARDIAN_ACTION_SPEED: str = os.getenv("WATSONX_GUARDIAN_ACTION_SPEED", "monitor_speed")
 GATEKEEPER_AGENT_ID: str = os.getenv("GATEKEEPER_AGENT_ID", "gatekeeper_v1")
+FLEET_CONTACT: str = os.getenv("FLEET_CONTACT", "fleet@company.com")
+GUARDIAN_BATCH_MAX_SIZE: int = int(os.getenv("GUARDIAN_BATCH_MAX_SIZE", "16"))
+GUARDIAN_BATCH_MAX_DELAY_S: float = float(os.getenv("GUARDIAN_BATCH_MAX_DELAY_S", "0.05"))
+
+# Pooled keep-alive session shared by every outbound watsonx/IAM call, sized so
+# every blocking worker thread can hold a connection
+_http_session = build_session(pool_maxsize=BLOCKING_THREAD_LIMIT)
 
 _wx_caller: Optional[WatsonxAgentCaller] = None
 try:
-    _wx_caller = WatsonxAgentCaller()
+    _wx_caller = WatsonxAgentCaller(session=_http_session)
     logger.info("✓ watsonx delegation ENABLED; server will call remote agents")
 except Exception as e:
     logger.error(f"❌ Failed to initialize WatsonxAgentCaller: {e}")
@@ -49,34 +105,108 @@ except Exception as e:
     logger.error(f"   - GUARDIAN_AGENT_ID (optional)")
     _wx_caller = None
 
-# Per-vehicle tool registries (stateful tools)
-_safety_tools: Dict[str, SafetyActuator] = {}
-_sos_tools: Dict[str, SOSDispatcher] = {}
-_speed_tools: Dict[str, SpeedDetector] = {}
-
-
+# Agent calls handed to worker threads at once. The hard cap on concurrent
+# Orchestrate requests (WATSONX_MAX_CONCURRENCY) is enforced by the caller
+# itself, since one agent call can fan out into several requests. Both of
+# these are created by the lifespan.
+_wx_sem: Optional[asyncio.Semaphore] = None
+
+# Driver/speed readings from concurrent requests share one Guardian invocation
+_guardian_batcher: Optional[GuardianBatcher] = None
+
+# Shared tool instances; the regulator also keeps reported violations across requests
+_cargo_scanner = CargoScanner()
+_regulator = RegulatorAPI()
+
+# Short-lived cache for per-vehicle read endpoints polled by dashboards.
+# Keyed by (kind, vehicle_id); writes to the same vehicle drop the entry.
+READ_CACHE_TTL_S: float = float(os.getenv("READ_CACHE_TTL_S", "2"))
+_read_cache: TTLCache = TTLCache(maxsize=4096, ttl=READ_CACHE_TTL_S)
+_SAFETY_READS: Tuple[str, ...] = ("safety_status", "safety_actions")
+# Per-vehicle reads are user data: only the client's own cache may keep them,
+# and no longer than our server-side cache would. SOS history is never cached
+# here and must always be revalidated, so a responder never acts on a stale
+# incident list.
+READ_CACHE_CONTROL: str = f"private, max-age={int(READ_CACHE_TTL_S)}"
+SOS_HISTORY_CACHE_CONTROL: str = "private, no-cache"
+
+# Per-vehicle tool registries (stateful tools), bounded so a long-running
+# server does not keep every vehicle it has ever seen. Least recently used
+# vehicles are evicted first. Only touched from the event loop thread.
+TOOL_REGISTRY_MAX_VEHICLES: int = int(os.getenv("TOOL_REGISTRY_MAX_VEHICLES", "10000"))
+_safety_tools: LRUCache = LRUCache(maxsize=TOOL_REGISTRY_MAX_VEHICLES)
+_sos_tools: LRUCache = LRUCache(maxsize=TOOL_REGISTRY_MAX_VEHICLES)
+_speed_tools: LRUCache = LRUCache(maxsize=TOOL_REGISTRY_MAX_VEHICLES)
+
+
+# vehicle_id path parameter, validated by FastAPI before the handler runs
+VehicleId = Annotated[str, PathParam(min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")]
+
+
+# The registry getters are plain functions called from async handlers on the
+# event loop and never await, so get-or-create cannot interleave between
+# requests. Keep them that way (no awaits, no calls from worker threads)
+# rather than adding locks.
 def _get_safety(vehicle_id: str) -> SafetyActuator:
-    if not vehicle_id:
-        raise HTTPException(status_code=400, detail="vehicle_id is required")
-    if vehicle_id not in _safety_tools:
-        _safety_tools[vehicle_id] = SafetyActuator()
-    return _safety_tools[vehicle_id]
+    tool = _safety_tools.get(vehicle_id)
+    if tool is None:
+        tool = _safety_tools[vehicle_id] = SafetyActuator()
+    return tool
 
 
 def _get_sos(vehicle_id: str) -> SOSDispatcher:
-    if not vehicle_id:
-        raise HTTPException(status_code=400, detail="vehicle_id is required")
-    if vehicle_id not in _sos_tools:
-        _sos_tools[vehicle_id] = SOSDispatcher()
-    return _sos_tools[vehicle_id]
+    tool = _sos_tools.get(vehicle_id)
+    if tool is None:
+        tool = _sos_tools[vehicle_id] = SOSDispatcher()
+    return tool
 
 
 def _get_speed(vehicle_id: str) -> SpeedDetector:
-    if not vehicle_id:
-        raise HTTPException(status_code=400, detail="vehicle_id is required")
-    if vehicle_id not in _speed_tools:
-        _speed_tools[vehicle_id] = SpeedDetector()
-    return _speed_tools[vehicle_id]
+    tool = _speed_tools.get(vehicle_id)
+    if tool is None:
+        tool = _speed_tools[vehicle_id] = SpeedDetector()
+    return tool
+
+
+async def _safety_dep(vehicle_id: VehicleId) -> SafetyActuator:
+    return _get_safety(vehicle_id)
+
+
+async def _sos_dep(vehicle_id: VehicleId) -> SOSDispatcher:
+    return _get_sos(vehicle_id)
+
+
+async def _speed_dep(vehicle_id: VehicleId) -> SpeedDetector:
+    return _get_speed(vehicle_id)
+
+
+def _cached_read(kind: str, vehicle_id: str, fetch: Callable[[], Any]) -> Any:
+    key = (kind, vehicle_id)
+    try:
+        return _read_cache[key]
+    except KeyError:
+        pass
+    value = fetch()
+    _read_cache[key] = value
+    return value
+
+
+async def _read_cache_headers(response: Response) -> None:
+    response.headers["Cache-Control"] = READ_CACHE_CONTROL
+
+
+async def _sos_history_cache_headers(response: Response) -> None:
+    response.headers["Cache-Control"] = SOS_HISTORY_CACHE_CONTROL
+
+
+def _invalidate_reads(vehicle_id: str, *kinds: str) -> None:
+    for kind in kinds:
+        _read_cache.pop((kind, vehicle_id), None)
+
+
+def _now_ms() -> int:
+    """Wall-clock epoch milliseconds without building a datetime."""
+    return time.time_ns() // 1_000_000
 
 
 def _get_swagger_json_path() -> Path:
@@ -87,6 +217,32 @@ def _get_swagger_json_path() -> Path:
     return swagger_path
 
 
+async def _run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call (e.g. a watsonx agent round-trip) off the event loop."""
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+
+async def _call_watsonx(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a watsonx agent call off the event loop, at most WATSONX_MAX_CONCURRENCY at a time."""
+    async with _wx_sem:
+        return await _run_blocking(func, *args, **kwargs)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_swagger_bytes() -> bytes:
+    """Read and validate docs/swagger.json once; the raw bytes are served as-is."""
+    swagger_path = _get_swagger_json_path()
+    if not swagger_path.exists():
+        raise HTTPException(status_code=404, detail="Swagger JSON not found")
+    try:
+        raw = swagger_path.read_bytes()
+        json.loads(raw)
+    except Exception as e:
+        logger.error(f"Failed to load swagger.json: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load swagger JSON")
+    return raw
+
+
 def _require_caller() -> WatsonxAgentCaller:
     if _wx_caller is None:
         raise HTTPException(
@@ -96,7 +252,12 @@ def _require_caller() -> WatsonxAgentCaller:
     return _wx_caller
 
 
-class DriverMonitoringRequest(BaseModel):
+class RequestModel(BaseModel):
+    """Base for request bodies: validated once, then treated as read-only"""
+    model_config = ConfigDict(frozen=True)
+
+
+class DriverMonitoringRequest(RequestModel):
     vehicle_id: str = Field(..., description="Vehicle identifier")
     eye_closure_pct: float = Field(..., ge=0, le=100)
     blink_duration_ms: float = Field(..., gt=0)
@@ -105,63 +266,75 @@ class DriverMonitoringRequest(BaseModel):
     lane_departures: int = Field(..., ge=0)
 
 
-class SpeedReadingRequest(BaseModel):
-    vehicle_id: str
+class SpeedReadingRequest(RequestModel):
+    vehicle_id: str = Field(..., min_length=1)
     current_speed_kmh: float = Field(..., ge=0)
     speed_limit_kmh: float = Field(..., gt=0)
     timestamp_ms: Optional[int] = None
 
 
 
-class FireSafetyState(BaseModel):
+class FireSafetyState(RequestModel):
     detected: bool
     confidence_pct: float = Field(..., ge=0, le=100)
     cabin_temp_c: float
     battery_pack_temp_c: float
 
 
-class WaterSafetyState(BaseModel):
+class WaterSafetyState(RequestModel):
     level_cm: float = Field(..., ge=0)
     flood_risk_level: str = Field(..., pattern="^(none|low|medium|high|critical)$")
     submersion_detected: bool
 
 
-class AccidentState(BaseModel):
+class AccidentState(RequestModel):
     collision_detected: bool
     impact_g_force: float = Field(..., ge=0)
     collision_severity_level: str = Field(..., pattern="^(none|low|medium|high|critical)$")
 
-class VehicleSafetyState(BaseModel):
+class VehicleSafetyState(RequestModel):
     fire: FireSafetyState
     water: WaterSafetyState
     accident: AccidentState
 
-class VehicleIncidentPayload(BaseModel):
+class VehicleIncidentPayload(RequestModel):
     vehicle_id: str
-    timestamp_ms: Optional[int] = Field(default_factory=lambda: int(datetime.now().timestamp() * 1000))
+    timestamp_ms: Optional[int] = Field(default_factory=_now_ms)
     lat: Optional[float] = None
     lon: Optional[float] = None
     alt: Optional[float] = None
     vehicle_safety_state: Optional[VehicleSafetyState] = None
 
-class VehicleUpdateRequest(BaseModel):
+class VehicleUpdateRequest(RequestModel):
     driver_data: Optional[DriverMonitoringRequest] = None
     speed_data: Optional[SpeedReadingRequest] = None
     incident_data: Optional[VehicleIncidentPayload] = None
 
 
-class GatekeeperInvokeRequest(BaseModel):
+# Readings per batch request; larger lists are split into GUARDIAN_BATCH_MAX_SIZE chunks
+MAX_BATCH_ITEMS = 256
+
+
+class DriverMonitoringBatch(RequestModel):
+    items: List[DriverMonitoringRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class SpeedReadingBatch(RequestModel):
+    items: List[SpeedReadingRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class GatekeeperInvokeRequest(RequestModel):
     action: str = Field(..., description="Gatekeeper action name (e.g., scan_cargo, check_compliance, authorize_vehicle)")
     payload: Dict[str, Any] = Field(..., description="Structured input payload with required fields. For scan_cargo: include vehicle_id, vehicle_class, vehicle_number, driver_name, cargo (with description, weight_kg, hazmat), etc.")
 
 
 # ============ Tool API Contracts ============
 
-class CargoScanQrRequest(BaseModel):
+class CargoScanQrRequest(RequestModel):
     qr_data: str
 
 
-class CargoCreateManifestRequest(BaseModel):
+class CargoCreateManifestRequest(RequestModel):
     manifest_id: str
     vehicle_id: str
     vehicle_number: str
@@ -173,71 +346,71 @@ class CargoCreateManifestRequest(BaseModel):
     )
 
 
-class RegulatorCargoComplianceRequest(BaseModel):
+class RegulatorCargoComplianceRequest(RequestModel):
     vehicle_class: str
     cargo_types: List[str]
 
 
-class RegulatorWeightRequest(BaseModel):
+class RegulatorWeightRequest(RequestModel):
     vehicle_class: str
     total_weight_kg: float
 
 
-class RegulatorSensorsRequest(BaseModel):
+class RegulatorSensorsRequest(RequestModel):
     vehicle_class: str
     installed_sensors: List[str]
 
 
-class RegulatorPermitRequest(BaseModel):
+class RegulatorPermitRequest(RequestModel):
     vehicle_id: str
     route: str
     cargo_type: str
 
 
-class RegulatorReportViolationRequest(BaseModel):
+class RegulatorReportViolationRequest(RequestModel):
     vehicle_id: str
     violation_type: str
     timestamp: str
 
 
-class SafetyPARequest(BaseModel):
+class SafetyPARequest(RequestModel):
     message: str
     language: str = "en"
 
 
-class SafetyDriverAlertRequest(BaseModel):
+class SafetyDriverAlertRequest(RequestModel):
     intensity: str = "high"
 
 
-class SafetySeatVibrationRequest(BaseModel):
+class SafetySeatVibrationRequest(RequestModel):
     intensity: str = "high"
     duration_s: int = Field(2, ge=1, le=30)
 
 
-class SafetyLightsRequest(BaseModel):
+class SafetyLightsRequest(RequestModel):
     pattern: str = "fast"
 
 
-class SafetyEmergencyRequest(BaseModel):
+class SafetyEmergencyRequest(RequestModel):
     incident_type: str
 
 
-class SOSAlertRequest(BaseModel):
-    vehicle_id: str
+class SOSAlertRequest(RequestModel):
+    vehicle_id: str = Field(..., min_length=1)
     incident_type: str
     location: Optional[Dict[str, float]] = None
     details: Optional[Dict[str, Any]] = None
 
 
-class SOSLocationUpdateRequest(BaseModel):
-    vehicle_id: str
+class SOSLocationUpdateRequest(RequestModel):
+    vehicle_id: str = Field(..., min_length=1)
     lat: float
     lon: float
     alt: Optional[float] = None
 
 
-class SOSFleetNotifyRequest(BaseModel):
-    vehicle_id: str
+class SOSFleetNotifyRequest(RequestModel):
+    vehicle_id: str = Field(..., min_length=1)
     message: str
 
 
@@ -247,21 +420,69 @@ async def healthz() -> Dict[str, str]:
 
 
 @app.get("/v1/openapi-examples.json")
-async def get_openapi_examples() -> Dict[str, Any]:
+async def get_openapi_examples() -> Response:
     """Serve the curated Swagger (OpenAPI) JSON with examples from docs/swagger.json.
 
     This exists alongside FastAPI's autogenerated /openapi.json and /docs. Use this
-    endpoint when you want the version with comprehensive examples.
+    endpoint when you want the version with comprehensive examples. The file is
+    loaded once at startup and returned without re-encoding.
     """
-    swagger_path = _get_swagger_json_path()
-    if not swagger_path.exists():
-        raise HTTPException(status_code=404, detail="Swagger JSON not found")
-    try:
-        with swagger_path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Failed to load swagger.json: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load swagger JSON")
+    return Response(
+        content=_load_swagger_bytes(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+def _driver_sensor(d: DriverMonitoringRequest) -> Dict[str, Any]:
+    return {
+        "eye_closure_pct": d.eye_closure_pct,
+        "blink_duration_ms": d.blink_duration_ms,
+        "yawning_rate_per_min": d.yawning_rate_per_min,
+        "steering_variability": d.steering_variability,
+        "lane_departures": d.lane_departures,
+    }
+
+
+def _speed_sensor(s: SpeedReadingRequest, now_ms: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "current_speed_kmh": s.current_speed_kmh,
+        "speed_limit_kmh": s.speed_limit_kmh,
+        "timestamp_ms": s.timestamp_ms or now_ms or _now_ms(),
+    }
+
+
+async def _assess_batch(readings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Assess readings with one Guardian invocation per GUARDIAN_BATCH_MAX_SIZE chunk."""
+    caller = _require_caller()
+    chunks = [
+        readings[i:i + GUARDIAN_BATCH_MAX_SIZE]
+        for i in range(0, len(readings), GUARDIAN_BATCH_MAX_SIZE)
+    ]
+    results = await asyncio.gather(*(
+        _call_watsonx(caller.call_guardian_agent_batch, GUARDIAN_AGENT_ID, chunk)
+        for chunk in chunks
+    ))
+    return [r for chunk_results in results for r in chunk_results]
+
+
+@app.post("/v1/driver/monitoring:batch")
+async def post_driver_monitoring_batch(body: DriverMonitoringBatch) -> List[Dict[str, Any]]:
+    """Assess many driver monitoring samples in one request; results are in input order."""
+    return await _assess_batch([
+        {"vehicle_id": d.vehicle_id, "action": WATSONX_GUARDIAN_ACTION_MONITOR, "sensor_data": _driver_sensor(d)}
+        for d in body.items
+    ])
+
+
+@app.post("/v1/speed:batch")
+async def post_speed_batch(body: SpeedReadingBatch) -> List[Dict[str, Any]]:
+    """Assess many speed readings in one request; results are in input order."""
+    now_ms = _now_ms()
+    return await _assess_batch([
+        {"vehicle_id": s.vehicle_id, "action": WATSONX_GUARDIAN_ACTION_SPEED, "sensor_data": _speed_sensor(s, now_ms)}
+        for s in body.items
+    ])
 
 
 @app.post("/v1/vehicle/update")
@@ -272,35 +493,22 @@ async def post_vehicle_update(payload: VehicleUpdateRequest):
     """
     caller = _require_caller()
     res = {}
+    readings: Dict[str, Dict[str, Any]] = {}
 
     # --- Driver monitoring ---
     if payload.driver_data:
-        driver_sensor = {
-            "eye_closure_pct": payload.driver_data.eye_closure_pct,
-            "blink_duration_ms": payload.driver_data.blink_duration_ms,
-            "yawning_rate_per_min": payload.driver_data.yawning_rate_per_min,
-            "steering_variability": payload.driver_data.steering_variability,
-            "lane_departures": payload.driver_data.lane_departures,
-        }
-        res["driver"] = caller.call_guardian_agent(
-            agent_id=GUARDIAN_AGENT_ID,
+        readings["driver"] = dict(
             vehicle_id=payload.driver_data.vehicle_id,
             action=WATSONX_GUARDIAN_ACTION_MONITOR,
-            sensor_data=driver_sensor
+            sensor_data=_driver_sensor(payload.driver_data)
         )
 
     # --- Speed ---
     if payload.speed_data:
-        speed_sensor = {
-            "current_speed_kmh": payload.speed_data.current_speed_kmh,
-            "speed_limit_kmh": payload.speed_data.speed_limit_kmh,
-            "timestamp_ms": payload.speed_data.timestamp_ms or int(datetime.now().timestamp() * 1000),
-        }
-        res["speed"] = caller.call_guardian_agent(
-            agent_id=GUARDIAN_AGENT_ID,
+        readings["speed"] = dict(
             vehicle_id=payload.speed_data.vehicle_id,
             action=WATSONX_GUARDIAN_ACTION_SPEED,
-            sensor_data=speed_sensor
+            sensor_data=_speed_sensor(payload.speed_data)
         )
 
  # --- Vehicle incident / safety ---
@@ -317,20 +525,31 @@ async def post_vehicle_update(payload: VehicleUpdateRequest):
         )
 
     sensor_data = {
-        "timestamp_ms": incident_payload.timestamp_ms or int(datetime.now().timestamp() * 1000),
+        "timestamp_ms": incident_payload.timestamp_ms or _now_ms(),
         "lat": getattr(incident_payload, "lat", None),
         "lon": getattr(incident_payload, "lon", None),
         "alt": getattr(incident_payload, "alt", None),
         "vehicle_safety_state": incident_payload.vehicle_safety_state.dict()
     }
 
-    res["incident"] = caller.call_guardian_agent(
+    # Coroutines are only created once every payload is built, so nothing
+    # above can raise and leave them un-awaited
+    batched = {key: _guardian_batcher.submit(**reading) for key, reading in readings.items()}
+    incident_call = _call_watsonx(
+        caller.call_guardian_agent,
         agent_id=GUARDIAN_AGENT_ID,
         vehicle_id=incident_payload.vehicle_id,
         action="detect_incident",
         sensor_data=sensor_data
     )
 
+    # The driver/speed batch and incident detection are independent agent calls;
+    # run them concurrently so the request waits for the slowest, not the sum.
+    # Driver and speed are submitted together so they land in the same batch.
+    results = await asyncio.gather(incident_call, *batched.values())
+    res.update(zip(batched.keys(), results[1:]))
+    res["incident"] = results[0]
+
     # Trigger emergency response if critical condition exists
     vs = incident_payload.vehicle_safety_state
     if vs.fire.detected or vs.water.submersion_detected or vs.accident.collision_detected:
@@ -342,14 +561,15 @@ async def post_vehicle_update(payload: VehicleUpdateRequest):
         elif vs.accident.collision_detected:
             incident_type = "collision"
 
-        emergency_res = caller.orchestrate_emergency_response(
+        emergency_res = await _call_watsonx(
+            caller.orchestrate_emergency_response,
             guardian_agent_id=GUARDIAN_AGENT_ID,
             vehicle_id=incident_payload.vehicle_id,
             incident_type=incident_type,
             sensor_data=sensor_data
         )
         res["incident"]["emergency_response"] = emergency_res
-    logger.info(f"Response from vehicle Monitor {res}")
+    logger.debug("Response from vehicle Monitor %s", res)
     return res
 
 
@@ -357,7 +577,8 @@ async def post_vehicle_update(payload: VehicleUpdateRequest):
 async def post_gatekeeper_run(body: GatekeeperInvokeRequest) -> Dict[str, Any]:
     """Invoke the watsonx Gatekeeper agent with a specified action and payload."""
     caller = _require_caller()
-    res = caller.call_gatekeeper_agent(
+    res = await _call_watsonx(
+        caller.call_gatekeeper_agent,
         agent_id=GATEKEEPER_AGENT_ID,
         action=body.action,
         payload=body.payload,
@@ -372,21 +593,21 @@ async def post_gatekeeper_run(body: GatekeeperInvokeRequest) -> Dict[str, Any]:
 
 @app.post("/v1/tools/cargo/scan-qr")
 async def tool_cargo_scan_qr(body: CargoScanQrRequest) -> Dict[str, Any]:
+    # scan_qr_code appends to the scanner's item cache, so use a throwaway
+    # instance rather than growing the shared one on every scan
     scanner = CargoScanner()
     return scanner.scan_qr_code(body.qr_data)
 
 
 @app.post("/v1/tools/cargo/create-manifest")
 async def tool_cargo_create_manifest(body: CargoCreateManifestRequest) -> Dict[str, Any]:
-    scanner = CargoScanner()
-    # seed scanned_items from provided items list
-    scanner.scanned_items = body.items
-    manifest = scanner.create_manifest(
+    manifest = _cargo_scanner.create_manifest(
         manifest_id=body.manifest_id,
         vehicle_id=body.vehicle_id,
         vehicle_number=body.vehicle_number,
         driver_name=body.driver_name,
         scanned_by=body.scanned_by,
+        items=body.items,
     )
     return manifest.model_dump()
 
@@ -395,104 +616,157 @@ async def tool_cargo_create_manifest(body: CargoCreateManifestRequest) -> Dict[s
 
 @app.post("/v1/tools/regulator/check-cargo-compliance")
 async def tool_reg_check_cargo(body: RegulatorCargoComplianceRequest) -> Dict[str, Any]:
-    api = RegulatorAPI()
-    return api.check_cargo_compliance(body.vehicle_class, body.cargo_types)
+    return _regulator.check_cargo_compliance(body.vehicle_class, body.cargo_types)
 
 
 @app.post("/v1/tools/regulator/check-weight")
 async def tool_reg_check_weight(body: RegulatorWeightRequest) -> Dict[str, Any]:
-    api = RegulatorAPI()
-    return api.check_weight_compliance(body.vehicle_class, body.total_weight_kg)
+    return _regulator.check_weight_compliance(body.vehicle_class, body.total_weight_kg)
 
 
 @app.post("/v1/tools/regulator/check-sensors")
 async def tool_reg_check_sensors(body: RegulatorSensorsRequest) -> Dict[str, Any]:
-    api = RegulatorAPI()
-    return api.check_sensor_requirements(body.vehicle_class, body.installed_sensors)
+    return _regulator.check_sensor_requirements(body.vehicle_class, body.installed_sensors)
 
 
 @app.post("/v1/tools/regulator/verify-permit")
 async def tool_reg_verify_permit(body: RegulatorPermitRequest) -> Dict[str, Any]:
-    api = RegulatorAPI()
-    return api.verify_transport_permit(body.vehicle_id, body.route, body.cargo_type)
+    return _regulator.verify_transport_permit(body.vehicle_id, body.route, body.cargo_type)
 
 
 @app.post("/v1/tools/regulator/report-violation")
 async def tool_reg_report_violation(body: RegulatorReportViolationRequest) -> Dict[str, Any]:
-    api = RegulatorAPI()
-    api.report_violation(body.vehicle_id, body.violation_type, body.timestamp)
+    _regulator.report_violation(body.vehicle_id, body.violation_type, body.timestamp)
+    _invalidate_reads(body.vehicle_id, "violations")
     return {"status": "recorded"}
 
 
-@app.get("/v1/tools/regulator/violations/{vehicle_id}")
-async def tool_reg_get_violations(vehicle_id: str) -> List[Dict[str, Any]]:
-    api = RegulatorAPI()
-    return api.get_violation_history(vehicle_id)
+@app.get("/v1/tools/regulator/violations/{vehicle_id}", dependencies=[Depends(_read_cache_headers)])
+async def tool_reg_get_violations(vehicle_id: VehicleId) -> List[Dict[str, Any]]:
+    return _cached_read("violations", vehicle_id, lambda: _regulator.get_violation_history(vehicle_id))
 
 
 # ============ Safety Actuator ============
 
 @app.post("/v1/tools/safety/{vehicle_id}/unlock-doors")
-async def tool_safety_unlock_doors(vehicle_id: str) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).unlock_all_doors()
+async def tool_safety_unlock_doors(vehicle_id: VehicleId, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.unlock_all_doors()
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/alarm")
-async def tool_safety_alarm(vehicle_id: str) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).activate_emergency_alarm()
+async def tool_safety_alarm(vehicle_id: VehicleId, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.activate_emergency_alarm()
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/pa")
-async def tool_safety_pa(vehicle_id: str, body: SafetyPARequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).activate_pa_system(body.message, body.language)
+async def tool_safety_pa(vehicle_id: VehicleId, body: SafetyPARequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.activate_pa_system(body.message, body.language)
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/lights")
-async def tool_safety_lights(vehicle_id: str, body: SafetyLightsRequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).activate_emergency_lighting() if body.pattern else _get_safety(vehicle_id).activate_emergency_lighting()
+async def tool_safety_lights(vehicle_id: VehicleId, body: SafetyLightsRequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.activate_emergency_lighting() if body.pattern else safety.activate_emergency_lighting()
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/driver-alert")
-async def tool_safety_driver_alert(vehicle_id: str, body: SafetyDriverAlertRequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).play_driver_alert_tone(body.intensity)
+async def tool_safety_driver_alert(vehicle_id: VehicleId, body: SafetyDriverAlertRequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.play_driver_alert_tone(body.intensity)
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/seat-vibration")
-async def tool_safety_seat_vibration(vehicle_id: str, body: SafetySeatVibrationRequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).seat_vibration(body.intensity, body.duration_s)
+async def tool_safety_seat_vibration(vehicle_id: VehicleId, body: SafetySeatVibrationRequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.seat_vibration(body.intensity, body.duration_s)
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/flash-lights")
-async def tool_safety_flash_lights(vehicle_id: str, body: SafetyLightsRequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).flash_cabin_lights(body.pattern)
+async def tool_safety_flash_lights(vehicle_id: VehicleId, body: SafetyLightsRequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.flash_cabin_lights(body.pattern)
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/emergency")
-async def tool_safety_emergency(vehicle_id: str, body: SafetyEmergencyRequest) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).execute_emergency_response(body.incident_type)
+async def tool_safety_emergency(vehicle_id: VehicleId, body: SafetyEmergencyRequest, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.execute_emergency_response(body.incident_type)
 
 
 @app.post("/v1/tools/safety/{vehicle_id}/deactivate")
-async def tool_safety_deactivate(vehicle_id: str) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).deactivate_emergency_systems()
+async def tool_safety_deactivate(vehicle_id: VehicleId, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    _invalidate_reads(vehicle_id, *_SAFETY_READS)
+    return safety.deactivate_emergency_systems()
 
 
-@app.get("/v1/tools/safety/{vehicle_id}/actions")
-async def tool_safety_actions(vehicle_id: str) -> List[Dict[str, Any]]:
-    return _get_safety(vehicle_id).get_actions_log()
+@app.get("/v1/tools/safety/{vehicle_id}/actions", dependencies=[Depends(_read_cache_headers)])
+async def tool_safety_actions(vehicle_id: VehicleId, safety: SafetyActuator = Depends(_safety_dep)) -> List[Dict[str, Any]]:
+    return _cached_read("safety_actions", vehicle_id, safety.get_actions_log)
 
 
-@app.get("/v1/tools/safety/{vehicle_id}/status")
-async def tool_safety_status(vehicle_id: str) -> Dict[str, Any]:
-    return _get_safety(vehicle_id).get_system_status()
+@app.get("/v1/tools/safety/{vehicle_id}/status", dependencies=[Depends(_read_cache_headers)])
+async def tool_safety_status(vehicle_id: VehicleId, safety: SafetyActuator = Depends(_safety_dep)) -> Dict[str, Any]:
+    return _cached_read("safety_status", vehicle_id, safety.get_system_status)
 
 
 # ============ SOS Dispatcher ============
 
+# Live SOS subscribers per vehicle, fed by send-alert; replaces polling the history
+SOS_EVENT_QUEUE_MAX = 100
+SSE_KEEPALIVE_S = 15.0
+_sos_subscribers: Dict[str, Set["asyncio.Queue[bytes]"]] = {}
+
+
+def _publish_sos_event(vehicle_id: str, event: Dict[str, Any]) -> None:
+    subscribers = _sos_subscribers.get(vehicle_id)
+    if not subscribers:
+        return
+    # Encode once; every subscriber gets the same SSE frame
+    frame = b"event: sos\ndata: " + orjson.dumps(event) + b"\n\n"
+    for q in subscribers:
+        try:
+            q.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("Dropping SOS event for slow subscriber on %s", vehicle_id)
+
+
+async def _sos_event_stream(vehicle_id: str) -> AsyncIterator[bytes]:
+    q: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=SOS_EVENT_QUEUE_MAX)
+    _sos_subscribers.setdefault(vehicle_id, set()).add(q)
+    try:
+        while True:
+            try:
+                yield await asyncio.wait_for(q.get(), SSE_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        subscribers = _sos_subscribers.get(vehicle_id)
+        if subscribers is not None:
+            subscribers.discard(q)
+            if not subscribers:
+                del _sos_subscribers[vehicle_id]
+
+
+@app.get("/v1/sos/events/{vehicle_id}")
+async def sos_events(vehicle_id: VehicleId) -> StreamingResponse:
+    """Server-Sent Events stream of SOS alerts for one vehicle."""
+    return StreamingResponse(
+        _sos_event_stream(vehicle_id),
+        media_type="text/event-stream",
+        # Content-Encoding keeps GZipMiddleware from buffering the stream
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"},
+    )
+
+
 @app.post("/v1/tools/sos/send-alert")
 async def tool_sos_send_alert(body: SOSAlertRequest) -> Dict[str, Any]:
     sos = _get_sos(body.vehicle_id)
-    return sos.send_sos_alert(body.vehicle_id, body.incident_type, body.location or {}, body.details or {})
+    result = sos.send_sos_alert(body.vehicle_id, body.incident_type, body.location or {}, body.details or {})
+    _publish_sos_event(body.vehicle_id, result)
+    return result
 
 
 @app.post("/v1/tools/sos/gps-update")
@@ -506,32 +780,30 @@ async def tool_sos_notify_fleet(body: SOSFleetNotifyRequest) -> Dict[str, Any]:
     sos = _get_sos(body.vehicle_id)
     # Backwards-compatible mapping: our SOSDispatcher expects (vehicle_id, incident_type, incident_details, contact_info)
     # but the API contract currently sends just a message. Use sensible defaults for missing fields.
-    contact = os.getenv("FLEET_CONTACT", "fleet@company.com")
     return sos.notify_fleet_manager(
         vehicle_id=body.vehicle_id,
         incident_type="INFO",
         incident_details=body.message,
-        contact_info=contact,
+        contact_info=FLEET_CONTACT,
     )
 
 
-@app.get("/v1/tools/sos/history/{vehicle_id}")
-async def tool_sos_history(vehicle_id: str) -> List[Dict[str, Any]]:
-    sos = _get_sos(vehicle_id)
+@app.get("/v1/tools/sos/history/{vehicle_id}", dependencies=[Depends(_sos_history_cache_headers)])
+async def tool_sos_history(vehicle_id: VehicleId, sos: SOSDispatcher = Depends(_sos_dep)) -> List[Dict[str, Any]]:
+    # Always read live: an emergency feed must never lag a dispatch, even by the cache TTL
     return sos.get_dispatch_history(vehicle_id)
 
 
 @app.post("/v1/tools/sos/{vehicle_id}/contacts/add")
-async def tool_sos_add_contact(vehicle_id: str, contact: Dict[str, str]) -> Dict[str, Any]:
-    sos = _get_sos(vehicle_id)
+async def tool_sos_add_contact(vehicle_id: VehicleId, contact: Dict[str, str], sos: SOSDispatcher = Depends(_sos_dep)) -> Dict[str, Any]:
     sos.add_emergency_contact(vehicle_id, contact)
+    _invalidate_reads(vehicle_id, "sos_contacts")
     return {"status": "added"}
 
 
-@app.get("/v1/tools/sos/{vehicle_id}/contacts")
-async def tool_sos_get_contacts(vehicle_id: str) -> List[Dict[str, str]]:
-    sos = _get_sos(vehicle_id)
-    return sos.get_emergency_contacts(vehicle_id)
+@app.get("/v1/tools/sos/{vehicle_id}/contacts", dependencies=[Depends(_read_cache_headers)])
+async def tool_sos_get_contacts(vehicle_id: VehicleId, sos: SOSDispatcher = Depends(_sos_dep)) -> List[Dict[str, str]]:
+    return _cached_read("sos_contacts", vehicle_id, lambda: sos.get_emergency_contacts(vehicle_id))
 
 
 # ============ Speed Detector ============
@@ -539,35 +811,35 @@ async def tool_sos_get_contacts(vehicle_id: str) -> List[Dict[str, str]]:
 @app.post("/v1/tools/speed/process")
 async def tool_speed_process(body: SpeedReadingRequest) -> Dict[str, Any]:
     sd = _get_speed(body.vehicle_id)
+    _invalidate_reads(body.vehicle_id, "speed_status")
     return sd.process_speed_reading(body.current_speed_kmh, body.speed_limit_kmh, body.timestamp_ms)
 
 
-@app.get("/v1/tools/speed/{vehicle_id}/status")
-async def tool_speed_status(vehicle_id: str) -> Dict[str, Any]:
-    sd = _get_speed(vehicle_id)
-    return sd.get_status()
+@app.get("/v1/tools/speed/{vehicle_id}/status", dependencies=[Depends(_read_cache_headers)])
+async def tool_speed_status(vehicle_id: VehicleId, sd: SpeedDetector = Depends(_speed_dep)) -> Dict[str, Any]:
+    return _cached_read("speed_status", vehicle_id, sd.get_status)
 
 
 @app.post("/v1/tools/speed/{vehicle_id}/reset")
-async def tool_speed_reset(vehicle_id: str) -> Dict[str, Any]:
-    sd = _get_speed(vehicle_id)
+async def tool_speed_reset(vehicle_id: VehicleId, sd: SpeedDetector = Depends(_speed_dep)) -> Dict[str, Any]:
     sd.reset()
+    _invalidate_reads(vehicle_id, "speed_status")
     return {"status": "reset"}
 
 
 @app.get("/v1/status/{vehicle_id}")
-async def get_status(vehicle_id: str) -> Dict[str, Any]:
+async def get_status(vehicle_id: VehicleId) -> Dict[str, Any]:
     # Not implemented without a dedicated watsonx status endpoint
     raise HTTPException(status_code=501, detail="Status endpoint not implemented for watsonx backend")
 
 
 @app.get("/v1/incidents/{vehicle_id}")
-async def get_incidents(vehicle_id: str) -> List[Dict[str, Any]]:
+async def get_incidents(vehicle_id: VehicleId) -> List[Dict[str, Any]]:
     # Not implemented without a remote log store
     raise HTTPException(status_code=501, detail="Incidents endpoint not implemented for watsonx backend")
 
 
 @app.get("/v1/alerts/{vehicle_id}")
-async def get_alerts(vehicle_id: str) -> List[Dict[str, Any]]:
+async def get_alerts(vehicle_id: VehicleId) -> List[Dict[str, Any]]:
     # Not implemented without a remote log store
     raise HTTPException(status_code=501, detail="Alerts endpoint not implemented for watsonx backend")
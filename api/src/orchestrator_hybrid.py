@@ -51,7 +51,7 @@ class HybridOrchestrator:
         if self.use_watsonx and HAS_WATSONX:
             logger.info("🚀 Using watsonx Orchestrate agents")
             try:
-                self.watsonx_caller = WatsonxAgentCaller()
+                self.watsonx_caller = WatsonxAgentCaller.get_default()
                 # Get agent IDs from environment
                 self.gatekeeper_agent_id = os.getenv("GATEKEEPER_AGENT_ID", "gatekeeper_v1")
                 self.guardian_agent_id = os.getenv("GUARDIAN_AGENT_ID", "guardian_v1")
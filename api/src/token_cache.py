@@ -0,0 +1,145 @@
+"""
+IAM token cache shared between processes
+
+Every API worker exchanges the same API key for an IAM token. Keeping the
+token outside the process means one IAM exchange per expiry window instead of
+one per worker, which also keeps us clear of IAM's API-key rate limits.
+
+Redis is used when REDIS_URL is set; otherwise tokens are kept in a small JSON
+file in a per-user directory under the temp directory. Cache failures are
+logged and treated as misses.
+"""
+
+import getpass
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache(Protocol):
+    """Stores (token, expiry) pairs; expiry is a Unix timestamp in seconds"""
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]: ...
+
+    def set(self, key: str, token: str, expiry: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+def token_cache_key(api_key: str) -> str:
+    """Cache key for an API key that does not reveal the key itself"""
+    return "watsonx_token_" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _owned_by_us(st: os.stat_result) -> bool:
+    # Platforms without uids (Windows) already keep the temp dir per user
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+class FileTokenCache:
+    """
+    Token cache backed by one JSON file per key
+
+    Entries are only trusted if this user owns them, so another account on a
+    shared host cannot plant a token for us to send.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        if directory is None:
+            user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+            directory = os.path.join(tempfile.gettempdir(), f"watsonx-tokens-{user}")
+        self.directory = directory
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create token cache directory: {e}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            with open(self._path(key)) as f:
+                if not _owned_by_us(os.fstat(f.fileno())):
+                    logger.warning(f"Ignoring token cache entry not owned by this user: {f.name}")
+                    return None
+                data = json.load(f)
+            token, expiry = data["token"], float(data["expiry"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable token cache entry: {e}")
+            return None
+        return (token, expiry) if expiry > time.time() else None
+
+    def set(self, key: str, token: str, expiry: float) -> None:
+        try:
+            if not _owned_by_us(os.stat(self.directory)):
+                logger.warning(f"Not caching token in a directory owned by another user: {self.directory}")
+                return
+            # Write-then-rename so readers never see a partial file; mkstemp
+            # creates the file readable by this user only
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"token": token, "expiry": expiry}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write token cache: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not clear token cache: {e}")
+
+
+class RedisTokenCache:
+    """Token cache backed by Redis; entries expire with the token"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            raw = self._redis.get(key)
+            if raw is None:
+                return None
+            data = json.loads(raw)
+            token, expiry = data["token"], float(data["expiry"])
+        except Exception as e:
+            logger.warning(f"Token cache lookup failed: {e}")
+            return None
+        return (token, expiry) if expiry > time.time() else None
+
+    def set(self, key: str, token: str, expiry: float) -> None:
+        try:
+            self._redis.set(key, json.dumps({"token": token, "expiry": expiry}), exat=int(expiry))
+        except Exception as e:
+            logger.warning(f"Could not write token cache: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._redis.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not clear token cache: {e}")
+
+
+def default_token_cache() -> TokenCache:
+    """Redis when REDIS_URL is set and reachable by the client library, else a temp file"""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            return RedisTokenCache(redis_url)
+        except Exception as e:
+            logger.warning(f"Redis token cache unavailable ({e}); using file cache")
+    return FileTokenCache()
@@ -3,7 +3,7 @@ Cargo Scanner Tool - QR code scanning and manifest parsing
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from src.models import CargoManifest, CargoItem, CargoType
 
 logger = logging.getLogger(__name__)
@@ -79,7 +79,8 @@ class CargoScanner:
         vehicle_id: str,
         vehicle_number: str,
         driver_name: str,
-        scanned_by: str
+        scanned_by: str,
+        items: Optional[List[Dict[str, Any]]] = None
     ) -> CargoManifest:
         """
         Create cargo manifest from scanned items
@@ -90,16 +91,18 @@ class CargoScanner:
             vehicle_number: License plate number
             driver_name: Driver name
             scanned_by: Scanner operator name
+            items: Item dicts to use instead of the scanned items cache
             
         Returns:
             CargoManifest object
         """
         from datetime import datetime
         
+        source_items = self.scanned_items if items is None else items
         items = []
         total_weight = 0
         
-        for item_data in self.scanned_items:
+        for item_data in source_items:
             try:
                 cargo_item = CargoItem(
                     item_id=item_data["item_id"],
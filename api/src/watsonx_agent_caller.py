@@ -16,17 +16,109 @@ API Documentation:
 
 import logging
 import os
-import json
+import orjson
+import random
 import requests
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
+from src.token_cache import TokenCache, default_token_cache, token_cache_key
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Polls kept at the base interval before backing off (most runs finish early)
+FAST_POLLS = 3
+POLL_BACKOFF_FACTOR = 1.5
+POLL_JITTER_S = 0.5
+# Server-side wait requested per poll; endpoints that reject it fall back to short polls
+LONG_POLL_WAIT_S = 30
+# Tokens are treated as expired this long before IAM's expires_in
+TOKEN_EXPIRY_MARGIN_S = 120
+# The background refresher renews tokens this long before they are treated as expired
+TOKEN_REFRESH_LEAD_S = 300
+TOKEN_REFRESH_MAX_BACKOFF_S = 300
+# Agent runs wait at most this long for a reply unless a workflow deadline is tighter
+AGENT_MAX_WAIT_S = 600
+# Total time budgets shared by every step of a workflow
+DEPARTURE_WORKFLOW_BUDGET_S = 600
+EMERGENCY_WORKFLOW_BUDGET_S = 300
+# Incident detection may only use this much of the emergency budget so the
+# door/alarm/PA/SOS actions always get to run
+EMERGENCY_DETECT_BUDGET_S = 30
+# Orchestrate requests one caller may have in flight at once, across every
+# thread using it (batch fallbacks and workflow steps fan out onto threads)
+WATSONX_MAX_CONCURRENCY = int(os.getenv("WATSONX_MAX_CONCURRENCY", "8"))
+IAM_BASE_URL = "https://iam.cloud.ibm.com"
+_IAM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _decode(response: requests.Response) -> Any:
+    """Parse a JSON response body with orjson, failing like response.json() does"""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.InvalidJSONError(str(e), response=response)
+
+
+def _strip_code_fences(text: str) -> str:
+    """Drop a surrounding ``` or ```json fence that agents like to wrap JSON replies in"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text[3:]
+        if text[:4].lower() == "json":
+            text = text[4:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def build_session(pool_maxsize: int = 16) -> requests.Session:
+    """
+    Keep-alive session for IAM and Orchestrate calls
+
+    Connections are pooled per host so repeated calls skip the TCP/TLS
+    handshake. The two backends get their own adapters:
+
+    - IAM token exchanges are rare and side-effect free, so they use a tiny
+      pool and are retried (POST included) on 429/5xx with backoff.
+    - Orchestrate traffic is frequent and long-running; it gets the large pool
+      and only light retries on 502/503/504, since the poll loop already backs
+      off on its own. Run POSTs are only retried when they never reached the
+      server.
+
+    Args:
+        pool_maxsize: Orchestrate connections kept open (size to the caller's thread count)
+    """
+    session = requests.Session()
+    orchestrate = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", orchestrate)
+    session.mount("http://", orchestrate)
+    iam = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=2,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+        ),
+    )
+    session.mount(IAM_BASE_URL, iam)  # longest prefix wins over the https:// mount
+    return session
+
 
 class WatsonxAgentCaller:
     """
@@ -36,10 +128,44 @@ class WatsonxAgentCaller:
     Agents must already exist in your watsonx instance with their agent IDs.
     
     Authentication: Uses IBM Cloud IAM tokens obtained from the API key.
+    
+    Instances are safe to share between threads: HTTP goes through a pooled
+    requests.Session, at most max_concurrency Orchestrate requests are sent at
+    once, and the token is kept fresh by a background thread.
+    Use get_default() for a process-wide instance.
     """
     
-    def __init__(self):
-        """Initialize watsonx agent caller with credentials from environment"""
+    _default: Optional["WatsonxAgentCaller"] = None
+    _default_lock = threading.Lock()
+    
+    @classmethod
+    def get_default(cls) -> "WatsonxAgentCaller":
+        """Return the process-wide caller, creating it on first use"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+    
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        token_cache: Optional[TokenCache] = None,
+        max_concurrency: int = WATSONX_MAX_CONCURRENCY,
+    ):
+        """
+        Initialize watsonx agent caller with credentials from environment
+
+        Args:
+            session: Shared pooled HTTP session for IAM and Orchestrate calls.
+                Defaults to a private one from build_session().
+            token_cache: Where IAM tokens are shared with other processes.
+                Defaults to Redis (REDIS_URL) or a temp file.
+            max_concurrency: Cap on Orchestrate requests in flight at once
+        """
+        self._http = session if session is not None else build_session()
+        self._request_slots = threading.BoundedSemaphore(max_concurrency)
+        self._token_cache = token_cache if token_cache is not None else default_token_cache()
         self.api_url = os.getenv("WATSONX_API_URL")
         self.api_key = os.getenv("WATSONX_API_KEY")
         self.project_id = os.getenv("WATSONX_PROJECT_ID")
@@ -53,23 +179,51 @@ class WatsonxAgentCaller:
             }.items() if not v]
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
         
-        self.iam_url = "https://iam.cloud.ibm.com/identity/token"
+        self.iam_url = f"{IAM_BASE_URL}/identity/token"
+        self._token_key = token_cache_key(self.api_key)
         self.access_token = None
-        self.token_expiry = None
+        self.token_expiry = None  # time.monotonic() deadline
+        # Precomputed request headers, swapped whole whenever the token rotates
+        self._headers: Optional[Dict[str, str]] = None
+        self._token_lock = threading.RLock()
+        self._stop = threading.Event()
+        # Cleared the first time the messages endpoint rejects the wait/after parameters
+        self._server_poll_params = True
         
-        # Get initial token
+        # Get initial token, then keep it fresh off the request path
         self._refresh_token()
+        self._refresher = threading.Thread(
+            target=self._token_refresh_loop, name="watsonx-token-refresh", daemon=True
+        )
+        self._refresher.start()
         
         logger.info("watsonx Agent Caller initialized")
         logger.info(f"API URL: {self.api_url}")
         logger.info("Using watsonx Orchestrate REST API for agent invocation")
     
-    def _refresh_token(self):
-        """Get a new IAM access token from IBM Cloud"""
+    def _refresh_token(self, force: bool = False):
+        """
+        Get a new IAM access token from IBM Cloud
+        
+        Args:
+            force: Skip the shared token cache (e.g. after a 401)
+        """
+        with self._token_lock:
+            if not force:
+                cached = self._token_cache.get(self._token_key)
+                if cached is not None:
+                    token, expires_at = cached
+                    self._set_token(token, expires_at - time.time())
+                    logger.debug("IAM token loaded from cache")
+                    return
+            self._fetch_token()
+    
+    def _fetch_token(self):
+        """Exchange the API key for a token at IAM and publish it to the cache"""
         try:
-            response = requests.post(
+            response = self._http.post(
                 self.iam_url,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                headers=_IAM_HEADERS,
                 data={
                     "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
                     "apikey": self.api_key,
@@ -77,26 +231,83 @@ class WatsonxAgentCaller:
                 timeout=10,
             )
             response.raise_for_status()
-            token_data = response.json()
-            self.access_token = token_data["access_token"]
-            self.token_expiry = datetime.now().timestamp() + token_data.get("expires_in", 3600) - 60
+            token_data = _decode(response)
+            valid_for = token_data.get("expires_in", 3600) - TOKEN_EXPIRY_MARGIN_S
+            self._set_token(token_data["access_token"], valid_for)
+            # The shared cache needs wall-clock time; other processes have their own monotonic clock
+            self._token_cache.set(self._token_key, self.access_token, time.time() + valid_for)
             logger.debug("IAM token refreshed successfully")
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to obtain IAM token: {e}")
             raise ValueError(f"Authentication failed: {e}")
     
+    def _set_token(self, token: str, valid_for: float):
+        self.access_token = token
+        self.token_expiry = time.monotonic() + valid_for
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+    
+    def _token_refresh_loop(self):
+        """Renew the token TOKEN_REFRESH_LEAD_S before expiry until close() is called"""
+        backoff = 5.0
+        # Never wake more often than every 30s, even for unusually short-lived tokens
+        while not self._stop.wait(max(30.0, self.token_expiry - TOKEN_REFRESH_LEAD_S - time.monotonic())):
+            try:
+                # Another process may already have put a fresh token in the cache
+                self._refresh_token()
+                if self.token_expiry - time.monotonic() <= TOKEN_REFRESH_LEAD_S:
+                    self._refresh_token(force=True)
+                backoff = 5.0
+            except Exception as e:
+                logger.warning(f"Background IAM token refresh failed, retrying in {backoff:.0f}s: {e}")
+                if self._stop.wait(backoff):
+                    break
+                backoff = min(backoff * 2, TOKEN_REFRESH_MAX_BACKOFF_S)
+    
+    def close(self):
+        """Stop the background token refresher"""
+        self._stop.set()
+    
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with valid bearer token"""
-        # Refresh token if expired
-        if self.access_token is None or datetime.now().timestamp() >= self.token_expiry:
-            self._refresh_token()
+        # While the refresher runs it keeps the token valid; otherwise refresh inline
+        if self._refresher.is_alive():
+            return self._headers
+        with self._token_lock:
+            if self.access_token is None or time.monotonic() >= self.token_expiry:
+                self._refresh_token()
+            return self._headers
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send an authenticated Orchestrate request
         
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
+        A 401 means the token was revoked or a cached token went stale; the
+        cache entry is dropped and the request retried once with a fresh token.
+        Each attempt waits for one of the max_concurrency request slots.
+        """
+        response = self._request(method, url, **kwargs)
+        if response.status_code == 401:
+            logger.info("IAM token rejected; fetching a new one")
+            self._token_cache.delete(self._token_key)
+            self._refresh_token(force=True)
+            response = self._request(method, url, **kwargs)
+        return response
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        headers = self._get_headers()
+        with self._request_slots:
+            return self._http.request(method, url, headers=headers, **kwargs)
 
-    def _invoke_agent(self, agent_id: str, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _invoke_agent(
+        self,
+        agent_id: str,
+        action: str,
+        payload: Dict[str, Any],
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Invoke a deployed watsonx agent via REST API and wait for response.
         
@@ -104,6 +315,8 @@ class WatsonxAgentCaller:
             agent_id: Agent ID in watsonx
             action: Action/instruction for the agent
             payload: Input data for the action
+            deadline: time.monotonic() value by which the reply must arrive;
+                caps the default AGENT_MAX_WAIT_S wait
             
         Returns:
             Response from watsonx agent including agent's actual response
@@ -111,9 +324,13 @@ class WatsonxAgentCaller:
         # Build the request to watsonx Orchestrate API
         # Endpoint: /v1/orchestrate/runs
         endpoint = f"{self.api_url}/v1/orchestrate/runs"
+        max_wait = AGENT_MAX_WAIT_S
+        if deadline is not None:
+            max_wait = min(max_wait, max(1, deadline - time.monotonic()))
         
         # Create message content combining action and payload
-        message_content = f"{action}\n\n{json.dumps(payload, indent=2)}"
+        # Serialized once, compactly; the agent doesn't need pretty-printing
+        message_content = f"{action}\n\n{orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()}"
         
         request_body = {
             "message": {
@@ -123,34 +340,37 @@ class WatsonxAgentCaller:
             "agent_id": agent_id,
         }
         
-        logger.debug(f"Invoking: POST {endpoint}")
-        logger.debug(f"Agent ID: {agent_id}")
-        logger.debug(f"Request body: {json.dumps(request_body, indent=2)}")
+        logger.debug("Invoking: POST %s (agent %s)", endpoint, agent_id)
+        logger.debug("Message content: %s", message_content)
         
         try:
-            headers = self._get_headers()
-            response = requests.post(
+            response = self._send(
+                "POST",
                 endpoint,
-                headers=headers,
                 json=request_body,
-                timeout=600,
+                timeout=max_wait,
             )
 
             response.raise_for_status()
-            run_response = response.json()
+            run_response = _decode(response)
             
             # Extract IDs for fetching the response
             thread_id = run_response.get("thread_id")
             message_id = run_response.get("message_id")
             
-            logger.debug(f"Run created: thread_id={thread_id}, message_id={message_id}")
+            logger.debug("Run created: thread_id=%s, message_id=%s", thread_id, message_id)
             
-            # Poll for the actual agent response
-            if thread_id:
+            # Fast agents may answer inline; only poll when the reply isn't here yet
+            inline = run_response.get("message")
+            if isinstance(inline, dict) and inline.get("role") == "assistant":
+                logger.debug("Agent response returned inline with the run")
+                run_response["agent_response"] = {**inline, "elapsed_seconds": 0, "polls_made": 0}
+            elif thread_id:
+                # The first poll is issued immediately; sleeps only happen between polls
                 agent_response = self._poll_for_agent_response(
                     thread_id, 
                     message_id,
-                    max_wait_seconds=600,
+                    max_wait_seconds=max_wait,
                     poll_interval=2.0
                 )
                 run_response["agent_response"] = agent_response
@@ -175,17 +395,16 @@ class WatsonxAgentCaller:
         # Format: /v1/orchestrate/threads/{thread_id}/messages/{message_id}
         endpoint = f"{self.api_url}/v1/orchestrate/threads/{thread_id}/messages/{message_id}"
         
-        logger.debug(f"Fetching agent response: GET {endpoint}")
+        logger.debug("Fetching agent response: GET %s", endpoint)
         
         try:
-            headers = self._get_headers()
-            response = requests.get(
+            response = self._send(
+                "GET",
                 endpoint,
-                headers=headers,
                 timeout=10,
             )
             response.raise_for_status()
-            return response.json()
+            return _decode(response)
         except requests.exceptions.RequestException as e:
             logger.warning(f"Could not fetch agent response: {e}")
             return {"error": str(e)}
@@ -195,28 +414,40 @@ class WatsonxAgentCaller:
         thread_id: str, 
         message_id: str,
         max_wait_seconds: int = 60,
-        poll_interval: float = 2.0
+        poll_interval: float = 2.0,
+        max_interval: float = 15.0
     ) -> Dict[str, Any]:
         """
         Poll for the agent's response until it's available.
         
+        Each GET asks the server to hold the request for up to LONG_POLL_WAIT_S
+        until a message arrives, and to return only messages after the newest
+        one already seen; time spent blocked there counts towards the next
+        poll delay. The first FAST_POLLS polls use poll_interval; after
+        that the interval grows exponentially up to max_interval, with jitter
+        so concurrent pollers don't line up.
+        
         Args:
             thread_id: Thread ID from the run
-            message_id: Message ID from the run
+            message_id: Message ID from the run (not used as the cursor)
             max_wait_seconds: Maximum time to wait for response (default 60s)
-            poll_interval: Time between polls in seconds (default 2s)
+            poll_interval: Initial time between polls in seconds (default 2s)
+            max_interval: Upper bound on the time between polls (default 15s)
             
         Returns:
             Agent response with content, or error if timeout
         """
         endpoint = f"{self.api_url}/v1/orchestrate/threads/{thread_id}/messages"
-        start_time = time.time()
+        start_time = time.monotonic()
         poll_count = 0
+        # Newest message already examined. The run's message_id may be the id of
+        # the reply itself, so it can't seed the cursor; start from the top
+        cursor: Optional[str] = None
         
-        logger.debug(f"Starting to poll for agent response (max {max_wait_seconds}s)")
+        logger.debug("Starting to poll for agent response (max %ss)", max_wait_seconds)
         
         while True:
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             
             # Check timeout
             if elapsed > max_wait_seconds:
@@ -229,46 +460,94 @@ class WatsonxAgentCaller:
                 }
             
             try:
-                headers = self._get_headers()
-                response = requests.get(
-                    endpoint,
-                    headers=headers,
-                    timeout=10,
-                )
+                poll_started = time.monotonic()
+                if self._server_poll_params:
+                    wait = min(LONG_POLL_WAIT_S, max(1, int(max_wait_seconds - elapsed)))
+                    params = {"wait": wait}
+                    if cursor:
+                        params["after"] = cursor
+                    response = self._send(
+                        "GET",
+                        endpoint,
+                        params=params,
+                        timeout=wait + 5,
+                    )
+                    if response.status_code == 400:
+                        logger.info("Messages endpoint rejected wait/after; using plain short polls")
+                        self._server_poll_params = False
+                        continue
+                    if response.status_code == 404:
+                        # Could be the parameters or a transient/unknown thread:
+                        # only give up on long polling if a plain GET works
+                        response = self._send("GET", endpoint, timeout=10)
+                        if response.ok:
+                            logger.info("Messages endpoint rejected wait/after; using plain short polls")
+                            self._server_poll_params = False
+                else:
+                    response = self._send(
+                        "GET",
+                        endpoint,
+                        timeout=10,
+                    )
                 response.raise_for_status()
                 
-                messages = response.json()
+                messages = _decode(response)
 
-                logger.debug(f"Polled messages: {json.dumps(messages, indent=2)}")
+                logger.debug("Polled %d messages", len(messages) if isinstance(messages, list) else 0)
                 
                 # Check if we have assistant messages (agent responses)
                 if isinstance(messages, list):
-                    assistant_messages = [
-                        msg for msg in messages 
-                        if isinstance(msg, dict) and msg.get("role") == "assistant"
-                    ]
+                    # Servers that ignore ?after= return the whole thread; skip
+                    # what earlier polls already examined
+                    messages = self._messages_after(messages, cursor)
+                    if messages and isinstance(messages[-1], dict) and messages[-1].get("id"):
+                        cursor = messages[-1]["id"]
+                    # The latest assistant message is normally last; stop at the first hit
+                    latest = next(
+                        (msg for msg in reversed(messages)
+                         if isinstance(msg, dict) and msg.get("role") == "assistant"),
+                        None
+                    )
                     
-                    if assistant_messages:
-                        logger.debug(f"Agent response received after {elapsed:.1f}s ({poll_count} polls)")
-                        # Return the latest assistant message
-                        latest = assistant_messages[-1]
+                    if latest is not None:
+                        logger.debug("Agent response received after %.1fs (%d polls)", elapsed, poll_count)
                         latest["elapsed_seconds"] = elapsed
                         latest["polls_made"] = poll_count
                         return latest
                 
                 # Still waiting for response
                 poll_count += 1
-                if poll_count % 5 == 1:  # Log every 5 polls
-                    logger.debug(f"Polling... ({poll_count} polls, {elapsed:.1f}s elapsed)")
+                if poll_count % 10 == 1:  # Log every 10 polls
+                    logger.debug("Polling... (%d polls, %.1fs elapsed)", poll_count, elapsed)
                 
-                time.sleep(poll_interval)
+                delay = self._poll_delay(poll_count, poll_interval, max_interval)
+                time.sleep(max(0.0, delay - (time.monotonic() - poll_started)))
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Poll attempt {poll_count + 1} failed: {e}")
                 poll_count += 1
-                time.sleep(poll_interval)
+                time.sleep(self._poll_delay(poll_count, poll_interval, max_interval))
                 continue
     
+    @staticmethod
+    def _messages_after(messages: List[Any], cursor: Optional[str]) -> List[Any]:
+        """Messages newer than the one whose id is cursor (all of them if it isn't present)"""
+        if cursor:
+            for i in range(len(messages) - 1, -1, -1):
+                msg = messages[i]
+                if isinstance(msg, dict) and msg.get("id") == cursor:
+                    return messages[i + 1:]
+        return messages
+    
+    @staticmethod
+    def _poll_delay(poll_count: int, poll_interval: float, max_interval: float) -> float:
+        """Seconds to wait before the next poll, given how many polls were made"""
+        if poll_count <= FAST_POLLS:
+            delay = poll_interval
+        else:
+            delay = min(max_interval, poll_interval * POLL_BACKOFF_FACTOR ** (poll_count - FAST_POLLS))
+        return delay + random.uniform(0, POLL_JITTER_S)
+    
     def _extract_clean_message(self, agent_message: Any) -> str:
         """
         Extract clean text from agent response, filtering out debug data.
@@ -285,16 +564,12 @@ class WatsonxAgentCaller:
         
         # If it's a list (common with Watson responses)
         if isinstance(agent_message, list):
-            # Extract text from list of response objects
-            texts = []
-            for item in agent_message:
-                if isinstance(item, dict):
-                    # Get text, avoiding debug fields
-                    if "text" in item:
-                        texts.append(item["text"])
-                elif isinstance(item, str):
-                    texts.append(item)
-            return " ".join(texts) if texts else ""
+            # Extract text from list of response objects, avoiding debug fields
+            return " ".join(
+                item if isinstance(item, str) else item["text"]
+                for item in agent_message
+                if isinstance(item, str) or (isinstance(item, dict) and "text" in item)
+            )
         
         # If it's a dict
         if isinstance(agent_message, dict):
@@ -306,11 +581,41 @@ class WatsonxAgentCaller:
         
         return ""
     
+    @staticmethod
+    def _run_concurrently(calls: List[Callable[[], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run independent agent calls on worker threads; results keep the input order"""
+        with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+            return list(pool.map(lambda call: call(), calls))
+    
+    def _parse_agent_result(self, result: Dict[str, Any]) -> Tuple[str, float]:
+        """
+        Pull the agent's reply out of an _invoke_agent result
+        
+        Returns:
+            (clean message text, seconds spent waiting for the reply)
+        """
+        agent_response = result.get("agent_response")
+        if not isinstance(agent_response, dict):
+            return "", 0
+        get = agent_response.get
+        if "content" in agent_response:
+            agent_message = get("content", "")
+        else:
+            agent_message = get("text", "")
+        return self._extract_clean_message(agent_message), get("elapsed_seconds", 0)
+    
+    @staticmethod
+    def _timed_out(result: Dict[str, Any]) -> bool:
+        """True if the agent did not reply before the wait for it ran out"""
+        agent_response = result.get("agent_response")
+        return isinstance(agent_response, dict) and agent_response.get("status") == "timeout"
+    
     def call_gatekeeper_agent(
         self,
         agent_id: str,
         action: str,
-        payload: Dict[str, Any]
+        payload: Dict[str, Any],
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Call the Gatekeeper Agent deployed in watsonx
@@ -319,6 +624,7 @@ class WatsonxAgentCaller:
             agent_id: Gatekeeper agent ID in watsonx
             action: Action to perform (scan_cargo, check_compliance, authorize_vehicle)
             payload: Input data for the action
+            deadline: Optional time.monotonic() deadline for the reply
             
         Returns:
             Formatted response for mobile app with agent decision and details
@@ -327,25 +633,20 @@ class WatsonxAgentCaller:
         logger.info(f"Action: {action}")
         
         try:
-            result = self._invoke_agent(agent_id, action, payload)
-            
-            # Extract agent response or use run details
-            agent_response = result.get("agent_response", {})
-            agent_message = ""
-            elapsed_seconds = 0
-            
-            if isinstance(agent_response, dict):
-                # Get the actual response content
-                if "content" in agent_response:
-                    agent_message = agent_response.get("content", "")
-                elif "text" in agent_response:
-                    agent_message = agent_response.get("text", "")
-                
-                # Track how long we waited
-                elapsed_seconds = agent_response.get("elapsed_seconds", 0)
+            result = self._invoke_agent(agent_id, action, payload, deadline)
+            if self._timed_out(result):
+                logger.warning(f"Gatekeeper Agent did not reply in time: {action}")
+                return {
+                    "agent": "gatekeeper",
+                    "action": action,
+                    "status": "timeout",
+                    "error": result["agent_response"].get("error"),
+                    "thread_id": result.get("thread_id"),
+                    "run_id": result.get("run_id"),
+                    "timestamp": datetime.now().isoformat()
+                }
             
-            # Clean the message to remove debug output
-            clean_message = self._extract_clean_message(agent_message)
+            clean_message, elapsed_seconds = self._parse_agent_result(result)
             
             logger.info(f"✓ Gatekeeper response received (waited {elapsed_seconds:.1f}s)")
             
@@ -383,7 +684,8 @@ class WatsonxAgentCaller:
         agent_id: str,
         vehicle_id: str,
         action: str,
-        sensor_data: Dict[str, Any]
+        sensor_data: Dict[str, Any],
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Call the Guardian Agent deployed in watsonx
@@ -393,6 +695,7 @@ class WatsonxAgentCaller:
             vehicle_id: Vehicle identifier
             action: Action to perform (monitor_driver, monitor_speed, detect_incident)
             sensor_data: Sensor readings from vehicle
+            deadline: Optional time.monotonic() deadline for the reply
             
         Returns:
             Formatted response for mobile app with agent assessment and details
@@ -406,25 +709,21 @@ class WatsonxAgentCaller:
                 "vehicle_id": vehicle_id,
                 "sensor_data": sensor_data,
             }
-            result = self._invoke_agent(agent_id, action, payload)
-            
-            # Extract agent response or use run details
-            agent_response = result.get("agent_response", {})
-            agent_message = ""
-            elapsed_seconds = 0
-            
-            if isinstance(agent_response, dict):
-                # Get the actual response content
-                if "content" in agent_response:
-                    agent_message = agent_response.get("content", "")
-                elif "text" in agent_response:
-                    agent_message = agent_response.get("text", "")
-                
-                # Track how long we waited
-                elapsed_seconds = agent_response.get("elapsed_seconds", 0)
+            result = self._invoke_agent(agent_id, action, payload, deadline)
+            if self._timed_out(result):
+                logger.warning(f"Guardian Agent did not reply in time: {action}")
+                return {
+                    "agent": "guardian",
+                    "vehicle_id": vehicle_id,
+                    "action": action,
+                    "status": "timeout",
+                    "error": result["agent_response"].get("error"),
+                    "thread_id": result.get("thread_id"),
+                    "run_id": result.get("run_id"),
+                    "timestamp": datetime.now().isoformat()
+                }
             
-            # Clean the message to remove debug output
-            clean_message = self._extract_clean_message(agent_message)
+            clean_message, elapsed_seconds = self._parse_agent_result(result)
             
             logger.info(f"✓ Guardian response received (waited {elapsed_seconds:.1f}s)")
             
@@ -459,12 +758,152 @@ class WatsonxAgentCaller:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def call_guardian_agent_batch(
+        self,
+        agent_id: str,
+        readings: List[Dict[str, Any]],
+        deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Call the Guardian Agent once for several independent readings
+        
+        The agent is asked to return a JSON array with one assessment per
+        reading, in order. If the reply cannot be split that way, the readings
+        are sent through call_guardian_agent concurrently, within what is left
+        of the deadline.
+        
+        Args:
+            agent_id: Guardian agent ID in watsonx
+            readings: Dicts with vehicle_id, action and sensor_data keys
+            deadline: Optional time.monotonic() deadline for the whole batch
+            
+        Returns:
+            One formatted response per reading, aligned with the input order
+        """
+        logger.info(f"Calling Guardian Agent: {agent_id} (batch of {len(readings)})")
+        if deadline is None:
+            deadline = time.monotonic() + AGENT_MAX_WAIT_S
+        
+        try:
+            result = self._invoke_agent(
+                agent_id,
+                "batch_assess: assess each reading independently and reply only with a "
+                "JSON array holding one assessment per reading, in the same order",
+                {"readings": readings},
+                deadline
+            )
+            
+            clean_message, elapsed_seconds = self._parse_agent_result(result)
+            assessments = orjson.loads(_strip_code_fences(clean_message))
+            if not isinstance(assessments, list) or len(assessments) != len(readings):
+                raise ValueError("batch response does not match the number of readings")
+        except Exception as e:
+            logger.warning(f"Batched Guardian call unusable ({e}); falling back to single calls")
+            return self._run_concurrently([
+                partial(self.call_guardian_agent, agent_id, r["vehicle_id"], r["action"], r["sensor_data"], deadline)
+                for r in readings
+            ])
+        
+        logger.info(f"✓ Guardian batch response received (waited {elapsed_seconds:.1f}s)")
+        
+        timestamp = datetime.now().isoformat()
+        responses = []
+        for reading, assessment in zip(readings, assessments):
+            if isinstance(assessment, dict):
+                assessment = assessment.get("assessment") or orjson.dumps(assessment).decode()
+            responses.append({
+                "agent": "guardian",
+                "vehicle_id": reading["vehicle_id"],
+                "action": reading["action"],
+                "status": "success",
+                "thread_id": result.get("thread_id"),
+                "run_id": result.get("run_id"),
+                "response_time_seconds": elapsed_seconds,
+                "timestamp": timestamp,
+                "assessment": str(assessment),
+            })
+        return responses
+    
+    def call_gatekeeper_agent_batch(
+        self,
+        agent_id: str,
+        actions: List[Tuple[str, Dict[str, Any]]],
+        deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a chain of Gatekeeper actions in one agent invocation
+        
+        The agent performs the actions in order, feeding each outcome into the
+        next, and replies with a JSON object keyed by action name. If the reply
+        cannot be read that way, the actions are run one call at a time,
+        stopping at the first one that fails.
+        
+        Args:
+            agent_id: Gatekeeper agent ID in watsonx
+            actions: (action, payload) pairs in execution order
+            deadline: Optional time.monotonic() deadline for the whole chain
+            
+        Returns:
+            One formatted response per action that ran, in order
+        """
+        logger.info(f"Calling Gatekeeper Agent: {agent_id} (chain of {len(actions)} actions)")
+        
+        try:
+            result = self._invoke_agent(
+                agent_id,
+                "batch_run: perform these actions in order, using the outcome of each "
+                "earlier action as input to the next, and reply only with a JSON object "
+                "mapping each action name to its decision",
+                {"actions": [{"action": action, "payload": payload} for action, payload in actions]},
+                deadline
+            )
+            clean_message, elapsed_seconds = self._parse_agent_result(result)
+            decisions = orjson.loads(_strip_code_fences(clean_message))
+            if not isinstance(decisions, dict) or any(action not in decisions for action, _ in actions):
+                raise ValueError("batch response is missing one or more actions")
+        except Exception as e:
+            logger.warning(f"Batched Gatekeeper call unusable ({e}); falling back to single calls")
+            responses = []
+            for action, payload in actions:
+                responses.append(self.call_gatekeeper_agent(agent_id, action, payload, deadline))
+                if responses[-1]["status"] != "success":
+                    break
+            return responses
+        
+        logger.info(f"✓ Gatekeeper batch response received (waited {elapsed_seconds:.1f}s)")
+        
+        timestamp = datetime.now().isoformat()
+        responses = []
+        for action, _ in actions:
+            decision = decisions[action]
+            if isinstance(decision, dict):
+                decision = decision.get("decision") or orjson.dumps(decision).decode()
+            responses.append({
+                "agent": "gatekeeper",
+                "action": action,
+                "status": "success",
+                "thread_id": result.get("thread_id"),
+                "run_id": result.get("run_id"),
+                "response_time_seconds": elapsed_seconds,
+                "timestamp": timestamp,
+                "decision": str(decision),
+            })
+        return responses
+    
+    @staticmethod
+    def _workflow_status(steps: List[Dict[str, Any]]) -> str:
+        """Overall status: timeout if any step ran out of time waiting for an agent"""
+        if any(step["result"].get("status") == "timeout" for step in steps):
+            return "timeout"
+        return "success"
+    
     def orchestrate_departure_workflow(
         self,
         gatekeeper_agent_id: str,
         guardian_agent_id: str,
         vehicle_id: str,
-        cargo_data: Dict[str, Any]
+        cargo_data: Dict[str, Any],
+        total_budget_s: float = DEPARTURE_WORKFLOW_BUDGET_S
     ) -> Dict[str, Any]:
         """
         Orchestrate complete departure workflow using both agents
@@ -474,6 +913,7 @@ class WatsonxAgentCaller:
             guardian_agent_id: Guardian agent ID in watsonx
             vehicle_id: Vehicle identifier
             cargo_data: Cargo manifest and details
+            total_budget_s: Time allowed for all steps together
             
         Returns:
             Workflow execution result
@@ -482,6 +922,7 @@ class WatsonxAgentCaller:
         logger.info("VEHICLE DEPARTURE WORKFLOW")
         logger.info("="*70)
         
+        deadline = time.monotonic() + total_budget_s
         workflow_result = {
             "workflow_id": "departure_workflow",
             "vehicle_id": vehicle_id,
@@ -490,78 +931,45 @@ class WatsonxAgentCaller:
         }
         
         try:
-            # Step 1: Gatekeeper - Scan Cargo
-            logger.info("\n[Step 1/6] Gatekeeper scanning cargo...")
-            scan_result = self.call_gatekeeper_agent(
+            # Steps 1-3: Gatekeeper scan, compliance and authorization in one agent run
+            logger.info("\n[Steps 1-3/6] Gatekeeper scanning cargo, checking compliance, authorizing departure...")
+            gate_results = self.call_gatekeeper_agent_batch(
                 gatekeeper_agent_id,
-                "scan_cargo",
-                {
-                    "vehicle_id": vehicle_id,
-                    "cargo": cargo_data
-                }
-            )
-            workflow_result["steps"].append({"step": 1, "result": scan_result})
-            
-            if scan_result["status"] != "success":
-                logger.warning("Cargo scan failed")
-                workflow_result["status"] = "failed"
-                return workflow_result
-            
-            # Step 2: Gatekeeper - Check Compliance
-            logger.info("[Step 2/6] Gatekeeper checking compliance...")
-            compliance_result = self.call_gatekeeper_agent(
-                gatekeeper_agent_id,
-                "check_compliance",
-                {
-                    "vehicle_id": vehicle_id,
-                    "cargo": cargo_data,
-                    "scan_data": scan_result.get("result")
-                }
+                [
+                    ("scan_cargo", {"vehicle_id": vehicle_id, "cargo": cargo_data}),
+                    ("check_compliance", {"vehicle_id": vehicle_id, "cargo": cargo_data}),
+                    ("authorize_vehicle", {"vehicle_id": vehicle_id}),
+                ],
+                deadline
             )
-            workflow_result["steps"].append({"step": 2, "result": compliance_result})
-            
-            if compliance_result["status"] != "success":
-                logger.warning("Compliance check failed")
-                workflow_result["status"] = "failed"
-                return workflow_result
+            gate_failures = {
+                1: ("Cargo scan failed", "failed"),
+                2: ("Compliance check failed", "failed"),
+                3: ("Vehicle authorization failed", "blocked"),
+            }
+            for step, gate_result in enumerate(gate_results, start=1):
+                workflow_result["steps"].append({"step": step, "result": gate_result})
+                if gate_result["status"] != "success":
+                    message, status = gate_failures[step]
+                    logger.warning(message)
+                    workflow_result["status"] = "timeout" if gate_result["status"] == "timeout" else status
+                    return workflow_result
             
-            # Step 3: Gatekeeper - Authorize Departure
-            logger.info("[Step 3/6] Gatekeeper authorizing vehicle departure...")
-            auth_result = self.call_gatekeeper_agent(
-                gatekeeper_agent_id,
-                "authorize_vehicle",
-                {
-                    "vehicle_id": vehicle_id,
-                    "compliance_status": compliance_result.get("result")
-                }
-            )
-            workflow_result["steps"].append({"step": 3, "result": auth_result})
+            logger.info("✓ Vehicle authorized for departure")
             
-            if auth_result["status"] != "success":
-                logger.warning("Vehicle authorization failed")
-                workflow_result["status"] = "blocked"
+            if time.monotonic() >= deadline:
+                logger.warning("Departure workflow budget exhausted before monitoring steps")
+                workflow_result["status"] = "timeout"
                 return workflow_result
             
-            logger.info("✓ Vehicle authorized for departure")
-            
-            # Step 4: Guardian - Activate Monitoring
+            # Steps 4 and 5 are independent Guardian calls; run them together
             logger.info("[Step 4/6] Guardian activating monitoring...")
-            monitor_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "activate_monitoring",
-                {}
-            )
-            workflow_result["steps"].append({"step": 4, "result": monitor_result})
-            
-            # Step 5: Guardian - Initialize Sensors
             logger.info("[Step 5/6] Guardian initializing sensors...")
-            init_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "initialize_sensors",
-                {}
-            )
+            monitor_result, init_result = self._run_concurrently([
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id, "activate_monitoring", {}, deadline),
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id, "initialize_sensors", {}, deadline),
+            ])
+            workflow_result["steps"].append({"step": 4, "result": monitor_result})
             workflow_result["steps"].append({"step": 5, "result": init_result})
             
             # Step 6: Vehicle Ready for Road
@@ -574,7 +982,7 @@ class WatsonxAgentCaller:
                 }
             })
             
-            workflow_result["status"] = "success"
+            workflow_result["status"] = self._workflow_status(workflow_result["steps"])
             workflow_result["completed_at"] = datetime.now().isoformat()
             
             logger.info("\n" + "="*70)
@@ -594,7 +1002,8 @@ class WatsonxAgentCaller:
         guardian_agent_id: str,
         vehicle_id: str,
         incident_type: str,
-        sensor_data: Dict[str, Any]
+        sensor_data: Dict[str, Any],
+        total_budget_s: float = EMERGENCY_WORKFLOW_BUDGET_S
     ) -> Dict[str, Any]:
         """
         Orchestrate emergency response workflow
@@ -604,6 +1013,7 @@ class WatsonxAgentCaller:
             vehicle_id: Vehicle identifier
             incident_type: Type of incident (overspeed, fatigue, etc.)
             sensor_data: Sensor readings
+            total_budget_s: Time allowed for all steps together
             
         Returns:
             Emergency response result
@@ -612,6 +1022,8 @@ class WatsonxAgentCaller:
         logger.info("🚨 EMERGENCY INCIDENT DETECTED")
         logger.info("!"*70)
         
+        started = time.monotonic()
+        deadline = started + total_budget_s
         response_result = {
             "workflow_id": "emergency_response_workflow",
             "vehicle_id": vehicle_id,
@@ -627,51 +1039,33 @@ class WatsonxAgentCaller:
                 guardian_agent_id,
                 vehicle_id,
                 "detect_incident",
-                sensor_data
+                sensor_data,
+                min(deadline, started + EMERGENCY_DETECT_BUDGET_S)
             )
             response_result["steps"].append({"step": 1, "result": detect_result})
+            if detect_result["status"] == "timeout":
+                # Still protect the occupants, but don't report a clean detection
+                logger.warning("Incident detection timed out; running safety actions anyway")
             
-            # Step 2: Unlock Doors
+            # Steps 2-5 don't depend on each other; fire them together so the
+            # occupants aren't kept waiting on four agent round-trips in a row
             logger.info("[Step 2/7] Unlocking vehicle doors...")
-            unlock_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "unlock_doors",
-                {"incident_type": incident_type}
-            )
-            response_result["steps"].append({"step": 2, "result": unlock_result})
-            
-            # Step 3: Activate Alarm
             logger.info("[Step 3/7] Activating alarm...")
-            alarm_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "activate_alarm",
-                {"incident_type": incident_type}
-            )
-            response_result["steps"].append({"step": 3, "result": alarm_result})
-            
-            # Step 4: Broadcast PA Alert
             logger.info("[Step 4/7] Broadcasting PA alert...")
-            pa_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "broadcast_pa_alert",
-                {"incident_type": incident_type}
-            )
-            response_result["steps"].append({"step": 4, "result": pa_result})
-            
-            # Step 5: Dispatch SOS
             logger.info("[Step 5/7] Dispatching SOS...")
-            sos_result = self.call_guardian_agent(
-                guardian_agent_id,
-                vehicle_id,
-                "dispatch_sos",
-                {
-                    "incident_type": incident_type,
-                    "sensor_data": sensor_data
-                }
-            )
+            unlock_result, alarm_result, pa_result, sos_result = self._run_concurrently([
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id,
+                        "unlock_doors", {"incident_type": incident_type}, deadline),
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id,
+                        "activate_alarm", {"incident_type": incident_type}, deadline),
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id,
+                        "broadcast_pa_alert", {"incident_type": incident_type}, deadline),
+                partial(self.call_guardian_agent, guardian_agent_id, vehicle_id,
+                        "dispatch_sos", {"incident_type": incident_type, "sensor_data": sensor_data}, deadline),
+            ])
+            response_result["steps"].append({"step": 2, "result": unlock_result})
+            response_result["steps"].append({"step": 3, "result": alarm_result})
+            response_result["steps"].append({"step": 4, "result": pa_result})
             response_result["steps"].append({"step": 5, "result": sos_result})
             
             # Step 6: Monitor Situation
@@ -688,7 +1082,7 @@ class WatsonxAgentCaller:
                 "result": {"status": "success", "message": "Emergency services notified"}
             })
             
-            response_result["status"] = "success"
+            response_result["status"] = self._workflow_status(response_result["steps"])
             response_result["completed_at"] = datetime.now().isoformat()
             
             logger.info("\n" + "!"*70)
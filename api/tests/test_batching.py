@@ -0,0 +1,162 @@
+"""
+Guardian Batcher Tests
+"""
+
+import asyncio
+import time
+
+import pytest
+from src.api.batching import GuardianBatcher
+
+
+class FakeGuardianCaller:
+    """Answers Guardian calls locally and records how they were batched"""
+
+    def __init__(self, delay_s=0.0, drop_last=False, error=None):
+        self.delay_s = delay_s
+        self.drop_last = drop_last
+        self.error = error
+        self.single_calls = []
+        self.batches = []
+
+    def _respond(self, vehicle_id):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        return {"agent": "guardian", "vehicle_id": vehicle_id, "status": "success"}
+
+    def call_guardian_agent(self, agent_id, vehicle_id, action, sensor_data, deadline=None):
+        self.single_calls.append(vehicle_id)
+        return self._respond(vehicle_id)
+
+    def call_guardian_agent_batch(self, agent_id, readings, deadline=None):
+        self.batches.append([r["vehicle_id"] for r in readings])
+        responses = [self._respond(r["vehicle_id"]) for r in readings]
+        return responses[:-1] if self.drop_last else responses
+
+
+def submit_all(batcher, vehicle_ids, **kwargs):
+    return asyncio.gather(
+        *(batcher.submit(v, "monitor_speed", {"current_speed_kmh": 50}, **kwargs) for v in vehicle_ids),
+        return_exceptions=True,
+    )
+
+
+class TestGuardianBatcher:
+    """Test cases for GuardianBatcher"""
+
+    def test_concurrent_readings_share_one_call(self):
+        caller = FakeGuardianCaller()
+        batcher = GuardianBatcher(caller, "guardian", max_batch_size=4)
+
+        async def scenario():
+            batcher.start()
+            results = await submit_all(batcher, ["VEH001", "VEH002", "VEH003"])
+            await batcher.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert [r["vehicle_id"] for r in results] == ["VEH001", "VEH002", "VEH003"]
+        assert caller.batches == [["VEH001", "VEH002", "VEH003"]]
+        assert caller.single_calls == []
+
+    def test_batches_are_capped_at_max_size(self):
+        caller = FakeGuardianCaller()
+        batcher = GuardianBatcher(caller, "guardian", max_batch_size=2)
+
+        async def scenario():
+            results = await submit_all(batcher, ["VEH001", "VEH002", "VEH003"])
+            await batcher.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert [r["vehicle_id"] for r in results] == ["VEH001", "VEH002", "VEH003"]
+        assert caller.batches == [["VEH001", "VEH002"]]
+        assert caller.single_calls == ["VEH003"]
+
+    def test_short_batch_reply_fails_unmatched_readings(self):
+        caller = FakeGuardianCaller(drop_last=True)
+        batcher = GuardianBatcher(caller, "guardian")
+
+        async def scenario():
+            results = await submit_all(batcher, ["VEH001", "VEH002"])
+            await batcher.aclose()
+            return results
+
+        first, second = asyncio.run(scenario())
+
+        assert first["vehicle_id"] == "VEH001"
+        assert isinstance(second, RuntimeError)
+
+    def test_caller_error_fails_every_reading(self):
+        caller = FakeGuardianCaller(error=ValueError("agent down"))
+        batcher = GuardianBatcher(caller, "guardian")
+
+        async def scenario():
+            results = await submit_all(batcher, ["VEH001", "VEH002"])
+            await batcher.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_close_fails_readings_still_collecting(self):
+        caller = FakeGuardianCaller()
+        batcher = GuardianBatcher(caller, "guardian", max_delay_s=30)
+
+        async def scenario():
+            pending = asyncio.ensure_future(submit_all(batcher, ["VEH001", "VEH002"]))
+            await asyncio.sleep(0.05)
+            await batcher.aclose()
+            return await asyncio.wait_for(pending, 1)
+
+        results = asyncio.run(scenario())
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert caller.batches == []
+
+    def test_close_fails_readings_in_flight(self):
+        caller = FakeGuardianCaller(delay_s=0.2)
+        batcher = GuardianBatcher(caller, "guardian", max_delay_s=0)
+
+        async def scenario():
+            pending = asyncio.ensure_future(submit_all(batcher, ["VEH001"]))
+            await asyncio.sleep(0.05)
+            await batcher.aclose()
+            return await asyncio.wait_for(pending, 1)
+
+        (result,) = asyncio.run(scenario())
+
+        assert isinstance(result, RuntimeError)
+
+    def test_submit_times_out_at_deadline(self):
+        caller = FakeGuardianCaller(delay_s=0.3)
+        batcher = GuardianBatcher(caller, "guardian", max_delay_s=0)
+
+        async def scenario():
+            results = await submit_all(batcher, ["VEH001"], deadline=time.monotonic() + 0.05)
+            await batcher.aclose()
+            return results
+
+        (result,) = asyncio.run(scenario())
+
+        assert isinstance(result, asyncio.TimeoutError)
+
+    @pytest.mark.parametrize("close_first", [True, False])
+    def test_restarts_on_a_new_event_loop(self, close_first):
+        caller = FakeGuardianCaller()
+        batcher = GuardianBatcher(caller, "guardian")
+
+        async def scenario():
+            batcher.start()
+            results = await submit_all(batcher, ["VEH001"])
+            if close_first:
+                await batcher.aclose()
+            return results
+
+        assert asyncio.run(scenario())[0]["vehicle_id"] == "VEH001"
+        assert asyncio.run(scenario())[0]["vehicle_id"] == "VEH001"
@@ -0,0 +1,267 @@
+"""
+FastAPI server tests
+
+The watsonx caller is replaced with a local fake, so these run without
+credentials or network access.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from src.api import server
+
+
+class FakeCaller:
+    """Stands in for WatsonxAgentCaller; echoes readings and records batching"""
+
+    def __init__(self):
+        self.batches = []
+
+    def call_guardian_agent(self, agent_id, vehicle_id, action, sensor_data, deadline=None):
+        return {"agent": "guardian", "vehicle_id": vehicle_id, "action": action, "status": "success"}
+
+    def call_guardian_agent_batch(self, agent_id, readings, deadline=None):
+        self.batches.append(len(readings))
+        return [
+            self.call_guardian_agent(agent_id, r["vehicle_id"], r["action"], r["sensor_data"])
+            for r in readings
+        ]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Start every test with empty read caches and tool registries"""
+    for cache in (server._read_cache, server._safety_tools, server._sos_tools, server._speed_tools):
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def fake_caller(monkeypatch):
+    caller = FakeCaller()
+    monkeypatch.setattr(server, "_wx_caller", caller)
+    return caller
+
+
+def driver_item(vehicle_id):
+    return {
+        "vehicle_id": vehicle_id,
+        "eye_closure_pct": 20.0,
+        "blink_duration_ms": 200.0,
+        "yawning_rate_per_min": 1.0,
+        "steering_variability": 0.1,
+        "lane_departures": 0,
+    }
+
+
+def speed_item(vehicle_id):
+    return {"vehicle_id": vehicle_id, "current_speed_kmh": 90.0, "speed_limit_kmh": 80.0}
+
+
+class TestReadCaching:
+    """Test cases for the short-lived per-vehicle read cache"""
+
+    def test_cached_reads_send_cache_control(self, client):
+        for path in (
+            "/v1/tools/regulator/violations/VEH001",
+            "/v1/tools/safety/VEH001/actions",
+            "/v1/tools/safety/VEH001/status",
+            "/v1/tools/sos/VEH001/contacts",
+            "/v1/tools/speed/VEH001/status",
+        ):
+            r = client.get(path)
+            assert r.status_code == 200
+            assert r.headers["Cache-Control"] == server.READ_CACHE_CONTROL
+
+    def test_reads_are_cached_until_ttl(self, client):
+        assert client.get("/v1/tools/safety/VEH001/status").json()["doors_unlocked"] is False
+        # A change made behind the API's back is not seen while the entry lives
+        server._get_safety("VEH001").doors_unlocked = True
+        assert client.get("/v1/tools/safety/VEH001/status").json()["doors_unlocked"] is False
+
+    def test_safety_write_invalidates_status_and_actions(self, client):
+        assert client.get("/v1/tools/safety/VEH001/status").json()["doors_unlocked"] is False
+        assert client.get("/v1/tools/safety/VEH001/actions").json() == []
+
+        client.post("/v1/tools/safety/VEH001/unlock-doors")
+
+        assert client.get("/v1/tools/safety/VEH001/status").json()["doors_unlocked"] is True
+        assert len(client.get("/v1/tools/safety/VEH001/actions").json()) == 1
+
+    def test_write_only_invalidates_its_vehicle(self, client):
+        client.get("/v1/tools/safety/VEH002/status")
+        server._get_safety("VEH002").doors_unlocked = True
+
+        client.post("/v1/tools/safety/VEH001/unlock-doors")
+
+        assert client.get("/v1/tools/safety/VEH002/status").json()["doors_unlocked"] is False
+
+    def test_violation_report_invalidates_history(self, client):
+        assert client.get("/v1/tools/regulator/violations/VEH001").json() == []
+
+        client.post("/v1/tools/regulator/report-violation", json={
+            "vehicle_id": "VEH001", "violation_type": "overspeed", "timestamp": "2024-01-01T00:00:00",
+        })
+
+        history = client.get("/v1/tools/regulator/violations/VEH001").json()
+        assert [v["violation_type"] for v in history][-1:] == ["overspeed"]
+
+    def test_speed_write_and_reset_invalidate_status(self, client):
+        assert client.get("/v1/tools/speed/VEH001/status").json()["last_status"] == {}
+
+        client.post("/v1/tools/speed/process", json={
+            "vehicle_id": "VEH001", "current_speed_kmh": 120, "speed_limit_kmh": 80,
+        })
+        assert client.get("/v1/tools/speed/VEH001/status").json()["last_status"] != {}
+
+        client.post("/v1/tools/speed/VEH001/reset")
+        assert client.get("/v1/tools/speed/VEH001/status").json()["last_status"] == {}
+
+    def test_contact_add_invalidates_contacts(self, client):
+        assert client.get("/v1/tools/sos/VEH001/contacts").json() == []
+
+        client.post("/v1/tools/sos/VEH001/contacts/add", json={"name": "Asha", "phone": "100"})
+
+        assert [c["name"] for c in client.get("/v1/tools/sos/VEH001/contacts").json()] == ["Asha"]
+
+    def test_sos_history_is_never_cached(self, client):
+        r = client.get("/v1/tools/sos/history/VEH001")
+        assert r.json() == []
+        assert r.headers["Cache-Control"] == "private, no-cache"
+
+        server._get_sos("VEH001").dispatch_log.append(
+            {"dispatch_id": "SOS_1", "sos_message": {"vehicle_id": "VEH001"}}
+        )
+
+        assert [d["dispatch_id"] for d in client.get("/v1/tools/sos/history/VEH001").json()] == ["SOS_1"]
+
+
+class TestBatchEndpoints:
+    """Test cases for the driver monitoring and speed batch endpoints"""
+
+    def test_driver_batch_results_keep_input_order(self, fake_caller, client):
+        ids = ["VEH001", "VEH002", "VEH003"]
+
+        r = client.post("/v1/driver/monitoring:batch", json={"items": [driver_item(v) for v in ids]})
+
+        assert r.status_code == 200
+        assert [res["vehicle_id"] for res in r.json()] == ids
+        assert {res["action"] for res in r.json()} == {server.WATSONX_GUARDIAN_ACTION_MONITOR}
+        assert fake_caller.batches == [3]
+
+    def test_speed_batch_is_chunked(self, fake_caller, client, monkeypatch):
+        monkeypatch.setattr(server, "GUARDIAN_BATCH_MAX_SIZE", 2)
+        ids = [f"VEH00{i}" for i in range(1, 6)]
+
+        r = client.post("/v1/speed:batch", json={"items": [speed_item(v) for v in ids]})
+
+        assert r.status_code == 200
+        assert [res["vehicle_id"] for res in r.json()] == ids
+        assert {res["action"] for res in r.json()} == {server.WATSONX_GUARDIAN_ACTION_SPEED}
+        assert sorted(fake_caller.batches) == [1, 2, 2]
+
+    def test_empty_and_oversized_batches_are_rejected(self, fake_caller, client):
+        assert client.post("/v1/speed:batch", json={"items": []}).status_code == 422
+        too_many = [speed_item("VEH001")] * (server.MAX_BATCH_ITEMS + 1)
+        assert client.post("/v1/speed:batch", json={"items": too_many}).status_code == 422
+
+    def test_batch_without_watsonx_is_unavailable(self, client, monkeypatch):
+        monkeypatch.setattr(server, "_wx_caller", None)
+        r = client.post("/v1/speed:batch", json={"items": [speed_item("VEH001")]})
+        assert r.status_code == 503
+
+
+class TestSOSEvents:
+    """Test cases for the SOS Server-Sent Events stream"""
+
+    def test_subscriber_receives_published_event(self):
+        async def scenario():
+            stream = server._sos_event_stream("VEH001")
+            next_frame = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            server._publish_sos_event("VEH001", {"dispatch_id": "SOS_1"})
+            frame = await asyncio.wait_for(next_frame, 1)
+            await stream.aclose()
+            return frame
+
+        assert asyncio.run(scenario()) == b'event: sos\ndata: {"dispatch_id":"SOS_1"}\n\n'
+
+    def test_events_only_reach_their_vehicle(self):
+        async def scenario():
+            stream = server._sos_event_stream("VEH001")
+            next_frame = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            server._publish_sos_event("VEH002", {"dispatch_id": "SOS_2"})
+            await asyncio.sleep(0.05)
+            delivered = next_frame.done()
+            next_frame.cancel()
+            await asyncio.gather(next_frame, return_exceptions=True)
+            await stream.aclose()
+            return delivered
+
+        assert asyncio.run(scenario()) is False
+
+    def test_closing_the_stream_unsubscribes(self):
+        async def scenario():
+            stream = server._sos_event_stream("VEH001")
+            next_frame = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            subscribed = len(server._sos_subscribers.get("VEH001", ()))
+            next_frame.cancel()
+            await asyncio.gather(next_frame, return_exceptions=True)
+            await stream.aclose()
+            return subscribed
+
+        assert asyncio.run(scenario()) == 1
+        assert "VEH001" not in server._sos_subscribers
+
+    def test_idle_stream_sends_keepalive(self, monkeypatch):
+        monkeypatch.setattr(server, "SSE_KEEPALIVE_S", 0.01)
+
+        async def scenario():
+            stream = server._sos_event_stream("VEH001")
+            frame = await asyncio.wait_for(stream.__anext__(), 1)
+            await stream.aclose()
+            return frame
+
+        assert asyncio.run(scenario()) == b": keepalive\n\n"
+
+    def test_send_alert_publishes_to_subscribers(self, client):
+        queue = asyncio.Queue()
+        server._sos_subscribers["VEH001"] = {queue}
+        try:
+            r = client.post("/v1/tools/sos/send-alert", json={"vehicle_id": "VEH001", "incident_type": "fire"})
+        finally:
+            del server._sos_subscribers["VEH001"]
+
+        assert r.status_code == 200
+        assert queue.qsize() == 1
+        assert queue.get_nowait().startswith(b"event: sos\ndata: ")
+
+
+class TestVehicleIdValidation:
+    """Test cases for the vehicle_id path parameter"""
+
+    @pytest.mark.parametrize("vehicle_id", ["VEH001", "veh-01_a", "A" * 64])
+    def test_valid_ids_are_accepted(self, client, vehicle_id):
+        assert client.get(f"/v1/tools/speed/{vehicle_id}/status").status_code == 200
+
+    @pytest.mark.parametrize("vehicle_id", ["VEH 001", "VEH.001", "VEH!001", "A" * 65])
+    def test_invalid_ids_are_rejected(self, client, vehicle_id):
+        r = client.get(f"/v1/tools/speed/{vehicle_id}/status")
+        assert r.status_code == 422
+        assert r.json()["detail"][0]["loc"] == ["path", "vehicle_id"]
+
+    def test_invalid_id_creates_no_tool_state(self, client):
+        client.post("/v1/tools/safety/bad id/unlock-doors")
+        assert "bad id" not in server._safety_tools
@@ -0,0 +1,143 @@
+"""
+IAM Token Cache Tests
+"""
+
+import json
+import os
+import time
+
+import pytest
+from src.token_cache import FileTokenCache, RedisTokenCache, token_cache_key
+
+
+class FakeRedis:
+    """In-memory stand-in for the few redis.Redis calls the cache makes"""
+
+    def __init__(self):
+        self.store = {}
+        self.expiries = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, exat=None):
+        self.store[key] = value.encode()
+        self.expiries[key] = exat
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError("redis down")
+
+    def set(self, key, value, exat=None):
+        raise ConnectionError("redis down")
+
+    def delete(self, key):
+        raise ConnectionError("redis down")
+
+
+class TestTokenCacheKey:
+    """Test cases for cache key derivation"""
+
+    def test_key_does_not_contain_api_key(self):
+        key = token_cache_key("secret-api-key")
+        assert "secret-api-key" not in key
+        assert key.startswith("watsonx_token_")
+
+    def test_key_is_stable_per_api_key(self):
+        assert token_cache_key("a") == token_cache_key("a")
+        assert token_cache_key("a") != token_cache_key("b")
+
+
+class TestFileTokenCache:
+    """Test cases for the file-backed token cache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return FileTokenCache(str(tmp_path))
+
+    def test_get_missing_key(self, cache):
+        assert cache.get("missing") is None
+
+    def test_set_then_get(self, cache):
+        expiry = time.time() + 60
+        cache.set("key", "token-1", expiry)
+        assert cache.get("key") == ("token-1", expiry)
+
+    def test_expired_entry_is_a_miss(self, cache):
+        cache.set("key", "token-1", time.time() - 1)
+        assert cache.get("key") is None
+
+    def test_set_replaces_entry(self, cache):
+        cache.set("key", "token-1", time.time() + 60)
+        cache.set("key", "token-2", time.time() + 60)
+        assert cache.get("key")[0] == "token-2"
+
+    def test_delete(self, cache):
+        cache.set("key", "token-1", time.time() + 60)
+        cache.delete("key")
+        assert cache.get("key") is None
+        cache.delete("key")  # deleting a missing key is not an error
+
+    def test_corrupt_entry_is_a_miss(self, cache, tmp_path):
+        (tmp_path / "key.json").write_text("not json")
+        assert cache.get("key") is None
+
+    def test_entry_is_private_to_user(self, cache, tmp_path):
+        cache.set("key", "token-1", time.time() + 60)
+        assert os.stat(tmp_path / "key.json").st_mode & 0o077 == 0
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="needs POSIX uids")
+    def test_entry_owned_by_another_user_is_ignored(self, cache, tmp_path, monkeypatch):
+        (tmp_path / "key.json").write_text(json.dumps({"token": "planted", "expiry": time.time() + 60}))
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(tmp_path).st_uid + 1)
+        assert cache.get("key") is None
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="needs POSIX uids")
+    def test_default_directory_is_per_user(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        cache = FileTokenCache()
+        assert cache.directory == str(tmp_path / f"watsonx-tokens-{os.getuid()}")
+        assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+
+class TestRedisTokenCache:
+    """Test cases for the Redis-backed token cache"""
+
+    @pytest.fixture
+    def redis(self):
+        return FakeRedis()
+
+    @pytest.fixture
+    def cache(self, redis):
+        cache = RedisTokenCache.__new__(RedisTokenCache)
+        cache._redis = redis
+        return cache
+
+    def test_get_missing_key(self, cache):
+        assert cache.get("missing") is None
+
+    def test_set_then_get(self, cache, redis):
+        expiry = time.time() + 60
+        cache.set("key", "token-1", expiry)
+        assert cache.get("key") == ("token-1", expiry)
+        assert redis.expiries["key"] == int(expiry)
+
+    def test_expired_entry_is_a_miss(self, cache):
+        cache.set("key", "token-1", time.time() - 1)
+        assert cache.get("key") is None
+
+    def test_delete(self, cache):
+        cache.set("key", "token-1", time.time() + 60)
+        cache.delete("key")
+        assert cache.get("key") is None
+
+    def test_redis_errors_are_misses(self):
+        cache = RedisTokenCache.__new__(RedisTokenCache)
+        cache._redis = BrokenRedis()
+        cache.set("key", "token-1", time.time() + 60)
+        cache.delete("key")
+        assert cache.get("key") is None
@@ -0,0 +1,361 @@
+"""
+watsonx Agent Caller Tests
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import pytest
+import requests
+from src import watsonx_agent_caller
+from src.watsonx_agent_caller import FAST_POLLS, POLL_JITTER_S, WatsonxAgentCaller
+
+
+def make_response(status_code, body=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = orjson.dumps(body) if body is not None else b""
+    return response
+
+
+class FakeSession:
+    """Records requests and answers them from a queue of canned responses"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.tokens_issued = 0
+
+    def post(self, url, **kwargs):
+        self.tokens_issued += 1
+        return make_response(200, {"access_token": f"token-{self.tokens_issued}", "expires_in": 3600})
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+class SlowSession(FakeSession):
+    """Holds every request briefly and records the peak number in flight"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return make_response(200, [])
+
+
+class MemoryTokenCache:
+    def __init__(self):
+        self.entries = {}
+        self.deleted = []
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        return entry if entry is not None and entry[1] > time.time() else None
+
+    def set(self, key, token, expiry):
+        self.entries[key] = (token, expiry)
+
+    def delete(self, key):
+        self.deleted.append(key)
+        self.entries.pop(key, None)
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def token_cache():
+    return MemoryTokenCache()
+
+
+@pytest.fixture
+def caller(monkeypatch, session, token_cache):
+    monkeypatch.setenv("WATSONX_API_URL", "https://orchestrate.example")
+    monkeypatch.setenv("WATSONX_API_KEY", "test-key")
+    caller = WatsonxAgentCaller(session=session, token_cache=token_cache)
+    yield caller
+    caller.close()
+
+
+def agent_reply(text):
+    return {"thread_id": "thread-1", "run_id": "run-1", "agent_response": {"content": text}}
+
+
+READINGS = [
+    {"vehicle_id": "VEH001", "action": "monitor_speed", "sensor_data": {"current_speed_kmh": 50}},
+    {"vehicle_id": "VEH002", "action": "monitor_speed", "sensor_data": {"current_speed_kmh": 90}},
+]
+
+
+class TestTokenHandling:
+    """Test cases for IAM token use"""
+
+    def test_initial_token_is_published_to_cache(self, caller, token_cache):
+        assert caller.access_token == "token-1"
+        assert token_cache.get(caller._token_key)[0] == "token-1"
+
+    def test_cached_token_skips_iam(self, monkeypatch, session, token_cache):
+        monkeypatch.setenv("WATSONX_API_URL", "https://orchestrate.example")
+        monkeypatch.setenv("WATSONX_API_KEY", "test-key")
+        first = WatsonxAgentCaller(session=session, token_cache=token_cache)
+        second = WatsonxAgentCaller(session=session, token_cache=token_cache)
+        first.close()
+        second.close()
+        assert session.tokens_issued == 1
+        assert second.access_token == "token-1"
+
+    def test_401_refreshes_token_and_retries_once(self, caller, session, token_cache):
+        session.responses = [make_response(401), make_response(200, [])]
+
+        response = caller._send("GET", "https://orchestrate.example/x")
+
+        assert response.status_code == 200
+        assert token_cache.deleted == [caller._token_key]
+        assert session.tokens_issued == 2
+        assert [kwargs["headers"]["Authorization"] for _, _, kwargs in session.requests] == [
+            "Bearer token-1", "Bearer token-2",
+        ]
+
+    def test_second_401_is_returned(self, caller, session):
+        session.responses = [make_response(401), make_response(401)]
+        assert caller._send("GET", "https://orchestrate.example/x").status_code == 401
+        assert len(session.requests) == 2
+
+
+class TestConcurrencyCap:
+    """Test cases for the cap on in-flight Orchestrate requests"""
+
+    def test_requests_from_many_threads_respect_cap(self, monkeypatch, token_cache):
+        monkeypatch.setenv("WATSONX_API_URL", "https://orchestrate.example")
+        monkeypatch.setenv("WATSONX_API_KEY", "test-key")
+        session = SlowSession()
+        caller = WatsonxAgentCaller(session=session, token_cache=token_cache, max_concurrency=2)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: caller._send("GET", "https://orchestrate.example/x"), range(8)))
+        finally:
+            caller.close()
+
+        assert session.peak == 2
+
+
+class TestPolling:
+    """Test cases for polling helpers"""
+
+    def test_messages_after_cursor(self):
+        messages = [{"id": "m1"}, {"id": "m2"}, {"id": "m3"}]
+        assert WatsonxAgentCaller._messages_after(messages, "m2") == [{"id": "m3"}]
+        assert WatsonxAgentCaller._messages_after(messages, "m3") == []
+
+    def test_messages_after_unknown_or_missing_cursor(self):
+        messages = [{"id": "m1"}, "not-a-dict"]
+        assert WatsonxAgentCaller._messages_after(messages, "gone") == messages
+        assert WatsonxAgentCaller._messages_after(messages, None) == messages
+
+    def test_poll_delay_fast_then_backoff(self, monkeypatch):
+        monkeypatch.setattr(watsonx_agent_caller.random, "uniform", lambda a, b: 0.0)
+        delays = [WatsonxAgentCaller._poll_delay(n, 2.0, 15.0) for n in range(1, FAST_POLLS + 4)]
+        assert delays[:FAST_POLLS] == [2.0] * FAST_POLLS
+        assert delays[FAST_POLLS:] == sorted(delays[FAST_POLLS:])
+        assert delays[FAST_POLLS] > 2.0
+        assert WatsonxAgentCaller._poll_delay(100, 2.0, 15.0) == 15.0
+
+    def test_poll_delay_jitter_is_bounded(self):
+        for _ in range(50):
+            assert 2.0 <= WatsonxAgentCaller._poll_delay(1, 2.0, 15.0) <= 2.0 + POLL_JITTER_S
+
+    def test_first_poll_sends_no_cursor(self, caller, session):
+        session.responses = [make_response(200, [{"id": "a1", "role": "assistant"}])]
+
+        caller._poll_for_agent_response("thread-1", "m1")
+
+        assert "after" not in session.requests[0][2]["params"]
+
+    def test_reply_with_the_run_message_id_is_found(self, caller, session):
+        session.responses = [make_response(200, [
+            {"id": "u1", "role": "user"},
+            {"id": "m1", "role": "assistant", "content": "all clear"},
+        ])]
+
+        latest = caller._poll_for_agent_response("thread-1", "m1", max_wait_seconds=5)
+
+        assert latest["content"] == "all clear"
+        assert len(session.requests) == 1
+
+    def test_cursor_advances_past_seen_messages(self, caller, session, monkeypatch):
+        monkeypatch.setattr(watsonx_agent_caller.time, "sleep", lambda s: None)
+        session.responses = [
+            make_response(200, [{"id": "u1", "role": "user"}]),
+            make_response(200, [{"id": "a1", "role": "assistant"}]),
+        ]
+
+        caller._poll_for_agent_response("thread-1", "m1")
+
+        assert session.requests[1][2]["params"]["after"] == "u1"
+
+    def test_400_disables_long_poll_params(self, caller, session):
+        session.responses = [make_response(400), make_response(200, [{"id": "a1", "role": "assistant"}])]
+
+        latest = caller._poll_for_agent_response("thread-1", "m1")
+
+        assert latest["id"] == "a1"
+        assert not caller._server_poll_params
+        assert "params" not in session.requests[1][2]
+
+    def test_404_disables_long_poll_params_only_if_plain_get_works(self, caller, session):
+        session.responses = [make_response(404), make_response(200, [{"id": "a1", "role": "assistant"}])]
+
+        latest = caller._poll_for_agent_response("thread-1", "m1")
+
+        assert latest["id"] == "a1"
+        assert not caller._server_poll_params
+        assert len(session.requests) == 2
+
+    def test_404_on_both_polls_keeps_long_poll_params(self, caller, session, monkeypatch):
+        monkeypatch.setattr(watsonx_agent_caller.time, "sleep", lambda s: None)
+        session.responses = [
+            make_response(404),
+            make_response(404),
+            make_response(200, [{"id": "a1", "role": "assistant"}]),
+        ]
+
+        latest = caller._poll_for_agent_response("thread-1", "m1")
+
+        assert latest["id"] == "a1"
+        assert caller._server_poll_params
+        assert "params" in session.requests[2][2]
+
+
+class TestBatchCalls:
+    """Test cases for batched Guardian and Gatekeeper calls"""
+
+    def test_guardian_batch_accepts_fenced_json(self, caller, monkeypatch):
+        reply = '```json\n["ok", {"assessment": "slow down"}]\n```'
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply(reply))
+
+        responses = caller.call_guardian_agent_batch("guardian", READINGS)
+
+        assert [r["vehicle_id"] for r in responses] == ["VEH001", "VEH002"]
+        assert [r["assessment"] for r in responses] == ["ok", "slow down"]
+
+    def test_guardian_batch_falls_back_to_single_calls(self, caller, monkeypatch):
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply("I can't do that"))
+        calls = []
+
+        def single(agent_id, vehicle_id, action, sensor_data, deadline=None):
+            calls.append((vehicle_id, deadline))
+            return {"vehicle_id": vehicle_id, "status": "success"}
+
+        monkeypatch.setattr(caller, "call_guardian_agent", single)
+        deadline = time.monotonic() + 30
+
+        responses = caller.call_guardian_agent_batch("guardian", READINGS, deadline)
+
+        assert [r["vehicle_id"] for r in responses] == ["VEH001", "VEH002"]
+        assert sorted(calls) == [("VEH001", deadline), ("VEH002", deadline)]
+
+    def test_guardian_batch_falls_back_on_wrong_length(self, caller, monkeypatch):
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply('["only one"]'))
+        monkeypatch.setattr(
+            caller, "call_guardian_agent",
+            lambda agent_id, vehicle_id, action, sensor_data, deadline=None: {"vehicle_id": vehicle_id},
+        )
+
+        responses = caller.call_guardian_agent_batch("guardian", READINGS)
+
+        assert [r["vehicle_id"] for r in responses] == ["VEH001", "VEH002"]
+
+    def test_gatekeeper_batch_accepts_fenced_json(self, caller, monkeypatch):
+        reply = '```\n{"scan_cargo": "clear", "check_compliance": {"decision": "ok"}}\n```'
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply(reply))
+
+        responses = caller.call_gatekeeper_agent_batch(
+            "gatekeeper", [("scan_cargo", {}), ("check_compliance", {})]
+        )
+
+        assert [r["decision"] for r in responses] == ["clear", "ok"]
+
+    def test_gatekeeper_batch_fallback_stops_at_first_failure(self, caller, monkeypatch):
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply('{"scan_cargo": "clear"}'))
+        calls = []
+
+        def single(agent_id, action, payload, deadline=None):
+            calls.append(action)
+            return {"action": action, "status": "error" if action == "check_compliance" else "success"}
+
+        monkeypatch.setattr(caller, "call_gatekeeper_agent", single)
+
+        responses = caller.call_gatekeeper_agent_batch(
+            "gatekeeper", [("scan_cargo", {}), ("check_compliance", {}), ("authorize_vehicle", {})]
+        )
+
+        assert calls == ["scan_cargo", "check_compliance"]
+        assert [r["status"] for r in responses] == ["success", "error"]
+
+
+def timed_out_reply():
+    return {
+        "thread_id": "thread-1",
+        "run_id": "run-1",
+        "agent_response": {"status": "timeout", "error": "Agent response not received within 30 seconds"},
+    }
+
+
+class TestWorkflowTimeouts:
+    """Test cases for agent timeouts inside workflows"""
+
+    def test_single_call_reports_timeout(self, caller, monkeypatch):
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: timed_out_reply())
+
+        result = caller.call_guardian_agent("guardian", "VEH001", "detect_incident", {})
+
+        assert result["status"] == "timeout"
+        assert "assessment" not in result
+
+    def test_emergency_detect_timeout_still_runs_actions(self, caller, monkeypatch):
+        actions = []
+
+        def invoke(agent_id, action, payload, deadline=None):
+            actions.append(action)
+            return timed_out_reply() if action == "detect_incident" else agent_reply("done")
+
+        monkeypatch.setattr(caller, "_invoke_agent", invoke)
+
+        result = caller.orchestrate_emergency_response("guardian", "VEH001", "fire", {})
+
+        assert result["status"] == "timeout"
+        assert result["steps"][0]["result"]["status"] == "timeout"
+        assert sorted(actions[1:]) == ["activate_alarm", "broadcast_pa_alert", "dispatch_sos", "unlock_doors"]
+
+    def test_emergency_without_timeouts_succeeds(self, caller, monkeypatch):
+        monkeypatch.setattr(caller, "_invoke_agent", lambda *args: agent_reply("done"))
+
+        result = caller.orchestrate_emergency_response("guardian", "VEH001", "fire", {})
+
+        assert result["status"] == "success"
+
+    def test_departure_gate_timeout(self, caller, monkeypatch):
+        def invoke(agent_id, action, payload, deadline=None):
+            return timed_out_reply() if action == "check_compliance" else agent_reply("ok")
+
+        monkeypatch.setattr(caller, "_invoke_agent", invoke)
+
+        result = caller.orchestrate_departure_workflow("gatekeeper", "guardian", "VEH001", {})
+
+        assert result["status"] == "timeout"
+        assert [s["result"]["status"] for s in result["steps"]] == ["success", "timeout"]
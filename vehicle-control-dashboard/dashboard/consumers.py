@@ -1,52 +1,64 @@
-import json
 import asyncio
+import logging
+import msgspec
 from channels.generic.websocket import AsyncWebsocketConsumer
 from datetime import datetime
 
+from .messages import VehicleSafetyState, encoder, frame_decoder
+
+logger = logging.getLogger(__name__)
+
+# Broadcasts arriving within this window are coalesced into one websocket frame
+BATCH_WINDOW_S = 0.02
+# Flush immediately once this many broadcasts are pending to bound latency
+MAX_BATCH = 64
+
+# connection_established has a fixed shape; only the timestamp varies
+_CONNECTED_PREFIX = '{"type":"connection_established","message":"Connected successfully","timestamp":"'
+_CONNECTED_SUFFIX = '"}'
+_BATCH_PREFIX = '{"type":"batch","items":['
+_BATCH_SUFFIX = ']}'
+
 class VehicleDataConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         """Handle WebSocket connection"""
-        self.ping_task = None
         self.connected = True
+        self._pending = []
+        self._flush_task = None
+        self._layer = self.channel_layer  # bound once, reused on every frame
         try:
-            await self.channel_layer.group_add("vehicle_data", self.channel_name)
+            await self._layer.group_add("vehicle_data", self.channel_name)
             await self.accept()
-            print(f"WebSocket client connected at {datetime.now().isoformat()}")
+            logger.info("WebSocket client connected: %s", self.channel_name)
 
-            # Start ping/pong mechanism
-            self.ping_task = asyncio.create_task(self.ping_loop())
+            # Keepalive is handled by the ASGI server with protocol-level
+            # PING frames (daphne --ping-interval/--ping-timeout)
 
             # Send initial connection success message
-            await self.send(text_data=json.dumps({
-                "type": "connection_established",
-                "message": "Connected successfully",
-                "timestamp": datetime.now().isoformat()
-            }))
+            await self.send(
+                text_data=_CONNECTED_PREFIX + datetime.now().isoformat() + _CONNECTED_SUFFIX
+            )
         except Exception as e:
-            print(f"Connection error: {str(e)}")
+            logger.error("Connection error: %s", e)
             self.connected = False
             raise
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
         self.connected = False
-        if self.ping_task:
-            self.ping_task.cancel()
-            try:
-                await self.ping_task
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                print(f"Error canceling ping task: {str(e)}")
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._pending = []
 
         try:
-            await self.channel_layer.group_discard("vehicle_data", self.channel_name)
+            await self._layer.group_discard("vehicle_data", self.channel_name)
         except Exception as e:
-            print(f"Error removing from group: {str(e)}")
+            logger.error("Error removing from group: %s", e)
 
-        print(f"WebSocket client disconnected with code: {close_code}")
+        logger.info("WebSocket client disconnected with code: %s", close_code)
         if close_code in [1011, 1006]:
-            print("Connection error detected. Please check server logs for details.")
+            logger.warning("Connection error detected. Please check server logs for details.")
 
     async def receive(self, text_data=None, bytes_data=None):
         """Handle incoming WebSocket messages"""
@@ -54,106 +66,91 @@ class VehicleDataConsumer(AsyncWebsocketConsumer):
             if not text_data:
                 return
 
-            message = json.loads(text_data)
-            print(f"Received message: {message}")
+            frame = frame_decoder.decode(text_data)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received message: %s", frame)
+
+            # Control messages (e.g. pongs) carry no telemetry; don't broadcast them as {}
+            if frame.driver_data is None and frame.speed_data is None and frame.emergency_data is None:
+                return
 
             # Normalize timestamps and incident structure
-            for key in ["driver_data", "speed_data", "emergency_data"]:
-                if key in message and message[key] is not None:
-                    if "timestamp_ms" not in message[key] and "timestamp" in message[key]:
+            now_ms = None  # read the clock at most once per frame
+            for section in (frame.driver_data, frame.speed_data, frame.emergency_data):
+                if section is not None and section.timestamp_ms is None:
+                    if section.timestamp is not None:
                         # convert ISO timestamp to ms
-                        dt = datetime.fromisoformat(message[key]["timestamp"])
-                        message[key]["timestamp_ms"] = int(dt.timestamp() * 1000)
-                    elif "timestamp_ms" not in message[key]:
-                        message[key]["timestamp_ms"] = int(datetime.now().timestamp() * 1000)
+                        dt = datetime.fromisoformat(section.timestamp)
+                        section.timestamp_ms = int(dt.timestamp() * 1000)
+                    else:
+                        if now_ms is None:
+                            now_ms = int(datetime.now().timestamp() * 1000)
+                        section.timestamp_ms = now_ms
 
             # Ensure emergency_data always has VehicleSafetyState structure
-            if "emergency_data" in message and message["emergency_data"] is not None:
-                incident = message["emergency_data"]
-                if "vehicle_safety_state" not in incident or incident["vehicle_safety_state"] is None:
-                    incident["vehicle_safety_state"] = {
-                        "fire": {
-                            "detected": False,
-                            "confidence_pct": 0,
-                            "cabin_temp_c": 25.0,
-                            "battery_pack_temp_c": 25.0
-                        },
-                        "water": {
-                            "level_cm": 0,
-                            "flood_risk_level": "none",
-                            "submersion_detected": False
-                        },
-                        "accident": {
-                            "collision_detected": False,
-                            "impact_g_force": 0.0,
-                            "collision_severity_level": "none"
-                        }
-                    }
-
-            # Handle pong response
-            if message.get("type") == "pong" and hasattr(self, "pong_received") and self.pong_received:
-                self.pong_received.set()
-                return
-
-            # Broadcast the combined message to all connected clients
-            await self.channel_layer.group_send(
+            if frame.emergency_data is not None and frame.emergency_data.vehicle_safety_state is None:
+                frame.emergency_data.vehicle_safety_state = VehicleSafetyState()
+
+            # Broadcast the combined message to all connected clients; the
+            # simulator sends driver, speed and incident data in one frame so
+            # each tick costs a single channel-layer call. The frame is encoded
+            # once here rather than once per receiving client.
+            await self._layer.group_send(
                 "vehicle_data",
                 {
                     "type": "broadcast_data",
-                    "event_data": message
+                    "event_json": encoder.encode(frame).decode()
                 }
             )
 
-        except json.JSONDecodeError as e:
+        except msgspec.DecodeError as e:
             error_msg = f"JSON decode error: {str(e)}"
-            print(error_msg)
-            await self.send(text_data=json.dumps({"error": error_msg}))
+            logger.warning(error_msg)
+            await self.send(text_data=encoder.encode({"error": error_msg}).decode())
         except Exception as e:
             error_msg = f"Error in receive: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             if self.connected:
-                await self.send(text_data=json.dumps({"error": error_msg}))
-
-    async def ping_loop(self):
-        """Send periodic pings to keep the connection alive"""
-        ping_interval = 15  # seconds
-        ping_timeout = 10   # seconds
-        while self.connected:
-            try:
-                await asyncio.sleep(ping_interval)
-                if not self.connected:
-                    break
-
-                # Send ping
-                await self.send(text_data=json.dumps({
-                    "type": "ping",
-                    "timestamp": datetime.now().isoformat()
-                }))
-
-                # Wait for pong
-                try:
-                    pong_received = asyncio.Event()
-                    self.pong_received = pong_received
-                    await asyncio.wait_for(pong_received.wait(), timeout=ping_timeout)
-                except asyncio.TimeoutError:
-                    print(f"Ping timeout at {datetime.now().isoformat()}")
-                    await self.close(code=1000)
-                    break
-
-            except Exception as e:
-                print(f"Ping error: {str(e)}")
-                break
+                await self.send(text_data=encoder.encode({"error": error_msg}).decode())
 
     async def broadcast_data(self, event):
         """Broadcast combined driver, speed, and incident data to WebSocket clients"""
         try:
-            message = event.get("event_data")
+            message = event.get("event_json")
             if not message:
-                print(f"Warning: No event_data in event: {event}")
+                logger.warning("No event_json in event: %s", event)
                 return
 
-            await self.send(text_data=json.dumps(message))
-            print(f"Broadcasted message keys: {list(message.keys())}")
+            self._pending.append(message)
+            if len(self._pending) >= MAX_BATCH:
+                if self._flush_task:
+                    self._flush_task.cancel()
+                    self._flush_task = None
+                await self.flush_pending()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_after(BATCH_WINDOW_S))
+        except Exception as e:
+            logger.error("Error in broadcast_data: %s (event: %s)", e, event)
+
+    async def _flush_after(self, delay):
+        """Wait for the batching window to close, then flush pending broadcasts"""
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self.flush_pending()
+
+    async def flush_pending(self):
+        """Send all pending broadcasts as a single frame"""
+        items, self._pending = self._pending, []
+        if not items or not self.connected:
+            return
+        try:
+            # Items are already-encoded JSON, so the batch is spliced as text
+            if len(items) == 1:
+                frame = items[0]
+            else:
+                frame = _BATCH_PREFIX + ",".join(items) + _BATCH_SUFFIX
+            await self.send(text_data=frame)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Broadcasted %d message(s)", len(items))
         except Exception as e:
-            print(f"Error in broadcast_data: {str(e)}")
-            print(f"Event data: {event}")
+            logger.error("Error flushing broadcasts: %s", e)
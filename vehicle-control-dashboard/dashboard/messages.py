@@ -0,0 +1,75 @@
+"""
+Typed telemetry frames exchanged over the vehicle_data websocket.
+
+Frames are decoded straight into these structs by msgspec, which validates
+the shape in C instead of walking generic dicts in Python.
+"""
+
+from typing import Optional
+
+import msgspec
+
+
+class FireState(msgspec.Struct):
+    detected: bool = False
+    confidence_pct: float = 0
+    cabin_temp_c: float = 25.0
+    battery_pack_temp_c: float = 25.0
+
+
+class WaterState(msgspec.Struct):
+    level_cm: float = 0
+    flood_risk_level: str = "none"
+    submersion_detected: bool = False
+
+
+class AccidentState(msgspec.Struct):
+    collision_detected: bool = False
+    impact_g_force: float = 0.0
+    collision_severity_level: str = "none"
+
+
+class VehicleSafetyState(msgspec.Struct):
+    fire: FireState = msgspec.field(default_factory=FireState)
+    water: WaterState = msgspec.field(default_factory=WaterState)
+    accident: AccidentState = msgspec.field(default_factory=AccidentState)
+
+
+class DriverData(msgspec.Struct, omit_defaults=True):
+    vehicle_id: str
+    eye_closure_pct: float
+    blink_duration_ms: float
+    yawning_rate_per_min: float
+    steering_variability: float
+    lane_departures: int
+    timestamp: Optional[str] = None
+    timestamp_ms: Optional[int] = None
+
+
+class SpeedData(msgspec.Struct, omit_defaults=True):
+    vehicle_id: str
+    current_speed_kmh: float
+    speed_limit_kmh: float
+    timestamp: Optional[str] = None
+    timestamp_ms: Optional[int] = None
+
+
+class EmergencyData(msgspec.Struct, omit_defaults=True):
+    vehicle_id: str
+    timestamp: Optional[str] = None
+    timestamp_ms: Optional[int] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    alt: Optional[float] = None
+    vehicle_safety_state: Optional[VehicleSafetyState] = None
+
+
+class VehicleFrame(msgspec.Struct, omit_defaults=True):
+    """One simulator tick: any combination of driver, speed and incident data"""
+    driver_data: Optional[DriverData] = None
+    speed_data: Optional[SpeedData] = None
+    emergency_data: Optional[EmergencyData] = None
+
+
+frame_decoder = msgspec.json.Decoder(VehicleFrame)
+encoder = msgspec.json.Encoder()
@@ -1,79 +1,105 @@
 from django.shortcuts import render
-from django.http import JsonResponse
-import requests
+from django.http import HttpResponse
+import httpx
+import orjson
 from django.views.decorators.http import require_http_methods
-import json
+import asyncio
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+# Shared pooled client so proxied calls reuse TCP+TLS connections. Clients are
+# bound to the event loop they were created on; under daphne every request
+# shares one loop, but if the view ever runs on a different loop (e.g. async
+# views served under WSGI) the old client is closed before a new one is made.
+_client = None
+_client_loop = None
+
+
+async def get_async_client():
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        if _client is not None:
+            try:
+                await _client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing stale HTTP client: {e}")
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            headers={
+                'User-Agent': 'VahanRakshakDashboard/1.0',
+                'Accept': 'application/json'
+            },
+        )
+        _client_loop = loop
+    return _client
+
+class OrjsonResponse(HttpResponse):
+    """JSON response serialized with orjson, which emits UTF-8 bytes directly"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=orjson.dumps(data), **kwargs)
+
+
+# Fallback payloads served when the backend stays unreachable after all retries
+SIMULATED_MONITORING_DATA = {
+    "vehicle_id": "VEH001",
+    "eye_closure_pct": 45.5,
+    "blink_duration_ms": 250,
+    "yawning_rate_per_min": 3.2,
+    "steering_variability": 0.4,
+    "lane_departures": 0,
+}
+SIMULATED_SPEED_DATA = {
+    "vehicle_id": "VEH001",
+    "current_speed_kmh": 65.5,
+    "speed_limit_kmh": 80,
+}
+
+
 def dashboard(request):
     return render(request, 'dashboard/index.html')
 
-def make_api_request(url, max_retries=3, retry_delay=1):
+async def make_api_request(url, max_retries=3, retry_delay=1):
     """Helper function to make API requests with retry logic"""
     for attempt in range(max_retries):
         try:
             # First try the actual API
-            response = requests.get(
-                url,
-                timeout=10,
-                headers={
-                    'User-Agent': 'VahanRakshakDashboard/1.0',
-                    'Accept': 'application/json'
-                }
-            )
+            client = await get_async_client()
+            response = await client.get(url)
             response.raise_for_status()
             return response.json(), response.status_code
-        
-        except requests.exceptions.RequestException as e:
+
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers a 200 whose body is not JSON (e.g. an HTML error page)
             logger.warning(f"API request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-            
-            # If all retries failed, return simulated data
-            if attempt == max_retries - 1:
-                if "monitoring" in url:
-                    # Return simulated driver monitoring data
-                    return {
-                        "vehicle_id": "VEH001",
-                        "eye_closure_pct": 45.5,
-                        "blink_duration_ms": 250,
-                        "yawning_rate_per_min": 3.2,
-                        "steering_variability": 0.4,
-                        "lane_departures": 0,
-                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-                    }, 200
-                elif "speed" in url:
-                    # Return simulated speed data
-                    return {
-                        "vehicle_id": "VEH001",
-                        "current_speed_kmh": 65.5,
-                        "speed_limit_kmh": 80,
-                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-                    }, 200
-            
-            # If not the last attempt, continue with retry logic
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
             if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+                await asyncio.sleep(retry_delay)
                 retry_delay *= 2  # Exponential backoff
-            else:
-                # Last attempt failed
-                return {'error': str(e), 'detail': 'Unable to reach the backend service'}, 502
+                continue
+
+            # All retries failed: fall back to simulated data where we have it
+            timestamp = time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            if "monitoring" in url:
+                return {**SIMULATED_MONITORING_DATA, "timestamp": timestamp}, 200
+            if "speed" in url:
+                return {**SIMULATED_SPEED_DATA, "timestamp": timestamp}, 200
+            return {'error': str(e), 'detail': 'Unable to reach the backend service'}, 502
 
 @require_http_methods(["GET"])
-def proxy_monitoring(request):
+async def proxy_monitoring(request):
     logger.info("Proxying request to driver monitoring endpoint")
-    data, status_code = make_api_request('https://vahan-rakshak-dbw4.onrender.com/v1/driver/monitoring')
-    return JsonResponse(data, status=status_code, safe=False)
+    data, status_code = await make_api_request('https://vahan-rakshak-dbw4.onrender.com/v1/driver/monitoring')
+    return OrjsonResponse(data, status=status_code)
 
 @require_http_methods(["GET"])
-def proxy_speed(request):
+async def proxy_speed(request):
     logger.info("Proxying request to speed endpoint")
-    data, status_code = make_api_request('https://vahan-rakshak-dbw4.onrender.com/v1/speed')
-    return JsonResponse(data, status=status_code, safe=False)
+    data, status_code = await make_api_request('https://vahan-rakshak-dbw4.onrender.com/v1/speed')
+    return OrjsonResponse(data, status=status_code)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,15 +30,33 @@ ALLOWED_HOSTS = []
 
 # Channels Configuration
 ASGI_APPLICATION = 'vehicle_simulator.asgi.application'
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+
+# Single-process deployments use the in-memory layer. Set RABBITMQ_URL to run
+# several daphne workers behind RabbitMQ, where group fan-out is one AMQP
+# publish handled by the broker (needs requirements-rabbitmq.txt).
+RABBITMQ_URL = os.getenv('RABBITMQ_URL')
+if RABBITMQ_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_rabbitmq.core.RabbitmqChannelLayer',
+            'CONFIG': {
+                'host': RABBITMQ_URL,
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        }
     }
-}
 
 # Application definition
 
 INSTALLED_APPS = [
+    # Must come first so `manage.py runserver` serves the ASGI application,
+    # giving async views and websockets one long-lived event loop
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -77,13 +96,6 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'vehicle_simulator.wsgi.application'
-ASGI_APPLICATION = 'vehicle_simulator.asgi.application'
-
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
-    }
-}
 
 # Allow all hosts for development
 ALLOWED_HOSTS = ['*']
@@ -140,3 +152,21 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Logging
+# Per-frame websocket logs in dashboard.consumers are DEBUG; keep the root
+# logger at WARNING unless DJANGO_LOG_LEVEL overrides it.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': os.getenv('DJANGO_LOG_LEVEL', 'WARNING'),
+    },
+}
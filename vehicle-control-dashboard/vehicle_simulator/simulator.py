@@ -1,12 +1,16 @@
-import json
+import logging
 import random
 import asyncio
+import orjson
 import websockets
 from datetime import datetime
 import aiohttp  # for sending HTTP requests
 
+logger = logging.getLogger(__name__)
+
 WS_URL = "ws://localhost:8001/ws/vehicle_data/"
 UNIFIED_URL = "https://vahan-rakshak.onrender.com/v1/vehicle/update"
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 class VehicleSimulator:
     def __init__(self, vehicle_id="VEH001"):
@@ -17,34 +21,40 @@ class VehicleSimulator:
         self.blink_duration = 200  # milliseconds
         self.is_running = False
         self.incident_count = 0
+        self._session = None  # shared aiohttp session, opened in start_simulation
+        self._backend_sem = asyncio.Semaphore(8)  # caps in-flight backend POSTs
+        self._bg_tasks = set()  # strong refs so pending POST tasks aren't GC'd
 
     # ----------------- Data generation -----------------
     def generate_driver_data(self):
-        self.eye_closure = min(100, self.eye_closure + random.uniform(-5, 8))
-        self.yawning_rate = min(10, max(0, self.yawning_rate + random.uniform(-0.5, 1)))
-        self.blink_duration = min(500, max(100, self.blink_duration + random.uniform(-20, 30)))
+        # Derive every field from raw random() draws; uniform()/randint() add
+        # a Python-level call layer per field on top of the same draw
+        r = random.random
+        self.eye_closure = min(100, self.eye_closure + r() * 13 - 5)
+        self.yawning_rate = min(10, max(0, self.yawning_rate + r() * 1.5 - 0.5))
+        self.blink_duration = min(500, max(100, self.blink_duration + r() * 50 - 20))
 
         return {
             "vehicle_id": self.vehicle_id,
             "eye_closure_pct": round(self.eye_closure, 2),
             "blink_duration_ms": round(self.blink_duration),
             "yawning_rate_per_min": round(self.yawning_rate, 2),
-            "steering_variability": round(random.uniform(0, 1), 2),
-            "lane_departures": random.randint(0, 2) if random.random() < 0.1 else 0
+            "steering_variability": round(r(), 2),
+            "lane_departures": int(r() * 3) if r() < 0.1 else 0
         }
 
-    def generate_speed_data(self):
-        speed_change = random.uniform(-5, 5)
+    def generate_speed_data(self, timestamp_ms=None):
+        speed_change = random.random() * 10 - 5
         self.speed = min(120, max(0, self.speed + speed_change))
 
         return {
             "vehicle_id": self.vehicle_id,
             "current_speed_kmh": round(self.speed, 1),
             "speed_limit_kmh": 80,
-            "timestamp_ms": int(datetime.now().timestamp() * 1000)
+            "timestamp_ms": timestamp_ms if timestamp_ms is not None else int(datetime.now().timestamp() * 1000)
         }
 
-    def generate_incident_data(self):
+    def generate_incident_data(self, timestamp_ms=None):
         fire_detected = random.random() < 0.05
         water_submersion = random.random() < 0.03
         collision_detected = random.random() < 0.02
@@ -54,7 +64,7 @@ class VehicleSimulator:
 
         return {
             "vehicle_id": self.vehicle_id,
-            "timestamp_ms": int(datetime.now().timestamp() * 1000),
+            "timestamp_ms": timestamp_ms if timestamp_ms is not None else int(datetime.now().timestamp() * 1000),
             "lat": round(random.uniform(12.9, 13.1), 6),
             "lon": round(random.uniform(77.5, 77.7), 6),
             "alt": round(random.uniform(900, 1200), 2),
@@ -79,101 +89,120 @@ class VehicleSimulator:
         }
 
     # ----------------- WebSocket & backend -----------------
-    async def send_data_to_websocket(self, websocket, data):
+    async def send_data_to_websocket(self, websocket, body):
+        """Send a pre-encoded JSON payload as a text frame"""
         try:
-            await websocket.send(json.dumps(data))
+            await websocket.send(body.decode())
             return True
         except websockets.exceptions.ConnectionClosed:
-            print(f"[{datetime.now().isoformat()}] WebSocket closed, reconnecting...")
+            logger.warning("WebSocket closed, reconnecting...")
             return False
         except Exception as e:
-            print(f"[{datetime.now().isoformat()}] WebSocket error: {str(e)}")
+            logger.error("WebSocket error: %s", e)
             return False
 
-    async def send_data_to_backend(self, payload):
-        """Fire-and-forget backend POST"""
+    async def send_data_to_backend(self, body):
+        """Fire-and-forget backend POST of a pre-encoded JSON payload"""
         async def _send():
-            async with aiohttp.ClientSession() as session:
+            async with self._backend_sem:
                 try:
-                    print(UNIFIED_URL)
-                    await session.post(UNIFIED_URL, json=payload)
-                    print(UNIFIED_URL)
-                    print(f"[{datetime.now().isoformat()}] Pinged backend (not waiting for response)")
+                    async with self._session.post(
+                        UNIFIED_URL,
+                        data=body,
+                        headers=JSON_HEADERS,
+                    ) as resp:
+                        # The body is only logged, never parsed; read a bounded prefix
+                        raw = await resp.content.read(1024)
+                        logger.debug("Backend status=%s body=%s", resp.status, raw[:256])
+                    logger.info("Pinged backend at %s", UNIFIED_URL)
                 except Exception as e:
-                    print(f"[{datetime.now().isoformat()}] Error sending to backend: {str(e)}")
-        asyncio.create_task(_send())
+                    logger.error("Error sending to backend: %s", e)
+        task = asyncio.create_task(_send())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
 
     async def listen_to_server(self, websocket):
-        """Listen to server messages (like ping) and respond with pong"""
+        """Drain server broadcasts so the receive buffer never fills.
+
+        Keepalive PING frames are protocol-level and answered by the
+        websockets library itself.
+        """
         try:
-            async for message in websocket:
-                try:
-                    data = json.loads(message)
-                    if data.get("type") == "ping":
-                        # respond with pong
-                        await websocket.send(json.dumps({
-                            "type": "pong",
-                            "timestamp": datetime.now().isoformat()
-                        }))
-                except Exception as e:
-                    print(f"Error processing server message: {str(e)}")
+            async for _ in websocket:
+                pass
         except websockets.exceptions.ConnectionClosed:
-            print(f"[{datetime.now().isoformat()}] WebSocket listener closed")
+            logger.info("WebSocket listener closed")
 
     # ----------------- Main simulation loop -----------------
     async def start_simulation(self):
         self.is_running = True
         consecutive_failures = 0
 
-        while True:
-            try:
-                # Disable client-side ping; server handles heartbeat
-                async with websockets.connect(WS_URL, ping_interval=None) as websocket:
-                    print(f"[{datetime.now().isoformat()}] Connected to WebSocket at {WS_URL}")
-
-                    # Start listener for server pings
-                    listener_task = asyncio.create_task(self.listen_to_server(websocket))
-
-                    while self.is_running:
-                        driver_data = self.generate_driver_data()
-                        speed_data = self.generate_speed_data()
-                        incident_data = self.generate_incident_data()
-
-                        payload = {
-                            "driver_data": driver_data,
-                            "speed_data": speed_data,
-                            "emergency_data": incident_data
-                        }
-
-                        ws_success = await self.send_data_to_websocket(websocket, payload)
-                        await self.send_data_to_backend(payload)  # fire-and-forget
-
-                        if ws_success:
-                            consecutive_failures = 0
-                        else:
-                            consecutive_failures += 1
-                            if consecutive_failures >= 5:
-                                print(f"[{datetime.now().isoformat()}] Too many failures. Waiting 30 seconds...")
-                                await asyncio.sleep(30)
+        # One pooled session for the whole run so backend POSTs reuse
+        # keep-alive connections instead of a TCP+TLS handshake per tick
+        connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as self._session:
+            while True:
+                try:
+                    # Disable client-side ping; server handles heartbeat
+                    async with websockets.connect(WS_URL, ping_interval=None) as websocket:
+                        logger.info("Connected to WebSocket at %s", WS_URL)
+
+                        # Start listener that drains server broadcasts
+                        listener_task = asyncio.create_task(self.listen_to_server(websocket))
+
+                        while self.is_running:
+                            # Single clock read shared by every reading in this tick
+                            now_ms = int(datetime.now().timestamp() * 1000)
+                            driver_data = self.generate_driver_data()
+                            speed_data = self.generate_speed_data(now_ms)
+                            incident_data = self.generate_incident_data(now_ms)
+
+                            # One composite frame per tick, so the server does a single
+                            # group_send instead of one per reading
+                            payload = {
+                                "driver_data": driver_data,
+                                "speed_data": speed_data,
+                                "emergency_data": incident_data
+                            }
+
+                            # Encode once; the websocket frame and the backend POST share it
+                            body = orjson.dumps(payload)
+                            ws_success = await self.send_data_to_websocket(websocket, body)
+                            await self.send_data_to_backend(body)  # fire-and-forget
+
+                            if ws_success:
                                 consecutive_failures = 0
+                            else:
+                                consecutive_failures += 1
+                                if consecutive_failures >= 5:
+                                    logger.warning("Too many failures. Waiting 30 seconds...")
+                                    await asyncio.sleep(30)
+                                    consecutive_failures = 0
 
-                        await asyncio.sleep(60)
+                            await asyncio.sleep(60)
 
-                    listener_task.cancel()
-                    try:
-                        await listener_task
-                    except asyncio.CancelledError:
-                        pass
+                        listener_task.cancel()
+                        try:
+                            await listener_task
+                        except asyncio.CancelledError:
+                            pass
 
-            except Exception as e:
-                print(f"[{datetime.now().isoformat()}] WebSocket connection error: {str(e)}. Retrying in 5 seconds...")
-                await asyncio.sleep(5)
+                except Exception as e:
+                    logger.error("WebSocket connection error: %s. Retrying in 5 seconds...", e)
+                    await asyncio.sleep(5)
 
     def stop_simulation(self):
         self.is_running = False
 
 # ----------------- Entry point -----------------
 async def main():
+    # The formatter stamps records only when they are emitted
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s.%(msecs)03d %(message)s",
+        datefmt="%Y-%m-%dT%H:%M:%S",
+    )
     simulator = VehicleSimulator("VEH001")
     print("Starting vehicle simulation. Press Ctrl+C to stop.")
     try: